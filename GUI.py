@@ -1,11 +1,14 @@
 import pygame
 import sys
 import random
+import threading
 from game import (
     create_board, placer_jeton_initial, jouer_coup, 
-    joueur_a_perdu, compter_jetons, BOARD_SIZE
+    joueur_a_perdu, joueur_suivant as joueur_suivant_plateau, compter_jetons, BOARD_SIZE
 )
-from minimax import minimax_bot as minimax
+from minimax import meilleur_coup, reflechir_pendant_adversaire, activer_cache_disque
+from mcts import MoteurMCTS
+from livre import coup_livre
 
 # -----------------------
 # CONFIGURATION
@@ -14,6 +17,11 @@ TAILLE_CASE = 60
 MARGE = 2
 LARGEUR = BOARD_SIZE * TAILLE_CASE + 300  # Espace pour le panneau latéral
 HAUTEUR = BOARD_SIZE * TAILLE_CASE
+TEMPS_BOT = 1.0  # Budget de réflexion du bot par coup (secondes)
+PROFONDEUR_BOT = None  # Profondeur maximale du bot (None = autant que TEMPS_BOT le permet)
+PONDERATION = True  # Le bot réfléchit aussi pendant le tour de son adversaire humain
+MOTEUR_BOT = "minimax"  # "minimax" ou "mcts" (voir mcts.py)
+CACHE_DISQUE = None  # Fichier du cache persistant des analyses minimax (ex. "analyses.sqlite"), None = aucun
 
 # Couleurs
 COULEUR_BG = (25, 25, 35)
@@ -48,6 +56,15 @@ class ColorWarsGame:
         self.joueurs_info = []  # Liste de "humain" ou "bot"
         self.gagnant = None
         
+        # Recherche du bot en cours dans un thread (None si aucune)
+        self.recherche_bot = None
+        # Réflexion du bot pendant le tour d'un humain (None si aucune)
+        self.reflexion_adverse = None
+        # Moteur MCTS (si MOTEUR_BOT == "mcts"): l'arbre est gardé d'un coup à l'autre
+        self.moteur_mcts = MoteurMCTS(temps_max=TEMPS_BOT, reutiliser_arbre=True)
+        if CACHE_DISQUE:
+            activer_cache_disque(CACHE_DISQUE)
+        
         # Animation
         self.selected_case = None
         self.hover_case = None
@@ -309,6 +326,8 @@ class ColorWarsGame:
             
             # Type de joueur
             type_joueur = self.joueurs_info[self.joueur_actuel - 1]
+            if self.recherche_bot is not None:
+                type_joueur += " - réflexion..."
             text = self.font_small.render(f"({type_joueur})", True, COULEUR_TEXTE)
             self.screen.blit(text, (panel_x + 20, y_offset))
             y_offset += 50
@@ -379,12 +398,18 @@ class ColorWarsGame:
                         self.joueur_actuel = 1
                     
         elif self.phase == "jeu":
+            # Le bot joue seul: les clics pendant son tour sont ignorés
+            if self.joueurs_info[self.joueur_actuel - 1] == "bot":
+                return
+            
             # Vérifier que le joueur n'est pas éliminé
             if joueur_a_perdu(self.plateau, self.joueur_actuel):
                 self.joueur_suivant()
                 return
             
             # Pendant le jeu, on ne peut jouer que sur ses propres cases
+            if self.plateau[x][y].joueur == self.joueur_actuel:
+                self.arreter_reflexion_adverse()
             if jouer_coup(self.plateau, x, y, self.joueur_actuel, autoriser_case_vide=False):
                 # Vérifier victoire
                 self.verifier_victoire()
@@ -392,23 +417,18 @@ class ColorWarsGame:
                 self.joueur_suivant()
     
     def joueur_suivant(self):
-        """Passe au joueur suivant en sautant les joueurs éliminés"""
-        tours_passes = 0
-        max_tours = len(self.joueurs_info)
-        
-        while tours_passes < max_tours:
-            self.joueur_actuel += 1
-            if self.joueur_actuel > len(self.joueurs_info):
-                self.joueur_actuel = 1
-            
-            # Si le joueur n'est pas éliminé, on s'arrête
-            if not joueur_a_perdu(self.plateau, self.joueur_actuel):
-                break
-            
-            tours_passes += 1
-        
+        """Passe au joueur suivant en sautant les joueurs éliminés (game.joueur_suivant)"""
+        self.joueur_actuel = self.prochain_joueur()
         # Si tous les joueurs sont éliminés sauf un, c'est déjà géré par verifier_victoire
     
+    def prochain_joueur(self):
+        """
+        Joueur qui jouera après le joueur actuel (sans changer de tour): même
+        ordre que le moteur (game.joueur_suivant), le joueur actuel lui-même
+        s'il est le seul encore en jeu
+        """
+        return joueur_suivant_plateau(self.plateau, self.joueur_actuel)
+    
     def verifier_victoire(self):
         """Vérifie si un joueur a gagné"""
         joueurs_en_vie = []
@@ -423,10 +443,15 @@ class ColorWarsGame:
     def traiter_tour_bot(self):
         """Fait jouer le bot"""
         if self.phase == "placement":
-            # Placement aléatoire
+            # Placement du livre d'ouvertures, sinon aléatoire
+            coup = coup_livre(self.plateau, self.joueur_actuel, len(self.joueurs_info), placement=True)
             while True:
-                x = random.randint(0, BOARD_SIZE - 1)
-                y = random.randint(0, BOARD_SIZE - 1)
+                if coup:
+                    x, y = coup
+                    coup = None
+                else:
+                    x = random.randint(0, BOARD_SIZE - 1)
+                    y = random.randint(0, BOARD_SIZE - 1)
                 if placer_jeton_initial(self.plateau, x, y, self.joueur_actuel):
                     self.joueur_actuel += 1
                     if self.joueur_actuel > len(self.joueurs_info):
@@ -440,9 +465,84 @@ class ColorWarsGame:
                 self.joueur_suivant()
                 return
             
-            if minimax(self.plateau, self.joueur_actuel):
+            # Position du livre: le coup est joué sans recherche
+            coup = coup_livre(self.plateau, self.joueur_actuel, len(self.joueurs_info))
+            if coup:
+                self.arreter_reflexion_adverse()
+                jouer_coup(self.plateau, coup[0], coup[1], self.joueur_actuel)
                 self.verifier_victoire()
                 self.joueur_suivant()
+                return
+            
+            self.lancer_recherche_bot()
+    
+    def lancer_recherche_bot(self):
+        """Lance la recherche du bot dans un thread, sur une copie du plateau"""
+        self.arreter_reflexion_adverse()
+        joueur = self.joueur_actuel
+        instantane = self.plateau.copie()
+        arret = threading.Event()
+        resultat = {}
+        
+        def rechercher():
+            if MOTEUR_BOT == "mcts":
+                resultat["coup"] = self.moteur_mcts.chercher(instantane, joueur, arret=arret)
+            else:
+                resultat["coup"] = meilleur_coup(instantane, joueur, temps_max=TEMPS_BOT,
+                                                 profondeur=PROFONDEUR_BOT, arret=arret)
+        
+        thread = threading.Thread(target=rechercher, daemon=True)
+        self.recherche_bot = {"thread": thread, "arret": arret, "joueur": joueur, "resultat": resultat}
+        thread.start()
+    
+    def verifier_recherche_bot(self):
+        """Joue le coup du bot si sa recherche est terminée"""
+        recherche = self.recherche_bot
+        if recherche is None or recherche["thread"].is_alive():
+            return
+        self.recherche_bot = None
+        
+        joueur = recherche["joueur"]
+        coup = recherche["resultat"].get("coup")
+        if coup:
+            premier_coup = joueur_a_perdu(self.plateau, joueur)
+            jouer_coup(self.plateau, coup[0], coup[1], joueur, autoriser_case_vide=premier_coup)
+            self.verifier_victoire()
+            self.joueur_suivant()
+    
+    def annuler_recherche_bot(self):
+        """Interrompt la recherche en cours; son coup ne sera pas joué"""
+        if self.recherche_bot is not None:
+            self.recherche_bot["arret"].set()
+            # L'arrêt est vu en quelques centaines de nœuds: on attend la fin
+            # du thread pour qu'il ne partage pas l'état de minimax avec le suivant
+            self.recherche_bot["thread"].join()
+            self.recherche_bot = None
+    
+    def lancer_reflexion_adverse(self):
+        """
+        Pendant le tour d'un humain, fait réfléchir le bot qui joue ensuite
+        à ses réponses (voir minimax.reflechir_pendant_adversaire).
+        """
+        bot = self.prochain_joueur()
+        humain = self.joueur_actuel
+        if MOTEUR_BOT != "minimax" or bot == humain or self.joueurs_info[bot - 1] != "bot":
+            return
+        arret = threading.Event()
+        thread = threading.Thread(
+            target=reflechir_pendant_adversaire,
+            args=(self.plateau.copie(), bot, humain, arret),
+            daemon=True
+        )
+        self.reflexion_adverse = {"thread": thread, "arret": arret}
+        thread.start()
+    
+    def arreter_reflexion_adverse(self):
+        """Arrête la réflexion sur le temps adverse (la table reste remplie)"""
+        if self.reflexion_adverse is not None:
+            self.reflexion_adverse["arret"].set()
+            self.reflexion_adverse["thread"].join()
+            self.reflexion_adverse = None
     
     def run(self):
         """Boucle principale du jeu"""
@@ -456,10 +556,14 @@ class ColorWarsGame:
             # Gestion des événements
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    self.arreter_reflexion_adverse()
+                    self.annuler_recherche_bot()
                     running = False
                 
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
+                        self.arreter_reflexion_adverse()
+                        self.annuler_recherche_bot()
                         self.phase = "menu"
                         self.create_menu_buttons()
                 
@@ -477,13 +581,18 @@ class ColorWarsGame:
                         if case:
                             self.traiter_clic_plateau(case)
             
-            # Tour du bot
-            if self.phase in ["placement", "jeu"]:
+            # Tour du bot: la recherche tourne dans un thread, on relève son
+            # résultat sans bloquer l'affichage
+            if self.recherche_bot is not None:
+                self.verifier_recherche_bot()
+            elif self.phase in ["placement", "jeu"]:
                 if self.joueurs_info[self.joueur_actuel - 1] == "bot":
                     bot_timer += dt
                     if bot_timer > 0.5:  # Délai de 0.5s pour le bot
                         self.traiter_tour_bot()
                         bot_timer = 0
+                elif PONDERATION and self.phase == "jeu" and self.reflexion_adverse is None:
+                    self.lancer_reflexion_adverse()
             
             # Rendu
             self.screen.fill(COULEUR_BG)
@@ -499,5 +608,6 @@ class ColorWarsGame:
             
             pygame.display.flip()
         
+        activer_cache_disque(None)  # Écrit les dernières analyses
         pygame.quit()
         sys.exit()
\ No newline at end of file
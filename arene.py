@@ -0,0 +1,327 @@
+"""
+Arène sans interface: parties bot contre bot en parallèle, avec classement Elo.
+
+Exemple:
+    python arene.py minimax:profondeur=3 minimax:profondeur=2 --parties 200 --sortie res.jsonl
+
+Chaque moteur est décrit par « nom[:option=valeur,...] » (voir MOTEURS et
+FABRIQUES), ex. mcts:temps=0.5,reutiliser=1. Les
+parties successives parcourent tous les ordres possibles des moteurs sur
+les places: chaque paire se rencontre autant de fois dans chaque ordre, ce
+qui équilibre l'avantage du premier joueur. Un moteur qui ne rend pas de
+coup valide (ou lève une exception) déclare forfait. Chaque partie est reproductible: le placement
+initial et les moteurs aléatoires sont tirés de sa graine, et la table de
+transposition est vidée au début de chaque partie.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations, permutations
+from random import Random
+
+import minimax
+from mcts import MoteurMCTS
+from game import create_board, placer_jeton_initial, jouer_coup, joueur_a_perdu, coups_possibles, BOARD_SIZE
+
+# Nombre maximal de coups (hors placement) avant de déclarer la partie nulle
+COUPS_MAX = 1000
+
+
+# -----------------------
+# MOTEURS
+# -----------------------
+def _coup_minimax(plateau, joueur, rng, profondeur=None, temps=None, noeuds=None):
+    """Coup de minimax.meilleur_coup (profondeur, temps et/ou nœuds)"""
+    return minimax.meilleur_coup(
+        plateau, joueur,
+        temps_max=None if temps is None else float(temps),
+        noeuds_max=None if noeuds is None else int(noeuds),
+        profondeur=None if profondeur is None else int(profondeur),
+    )
+
+
+def _coup_aleatoire(plateau, joueur, rng):
+    """Coup au hasard parmi les cases du joueur"""
+    coups = coups_possibles(plateau, joueur)
+    return rng.choice(coups) if coups else None
+
+
+def _moteur_mcts(temps=None, iterations=None, reutiliser="0"):
+    """MoteurMCTS propre à une place pour une partie (son arbre peut être réutilisé)"""
+    return MoteurMCTS(
+        temps_max=None if temps is None else float(temps),
+        iterations_max=None if iterations is None else int(iterations),
+        reutiliser_arbre=reutiliser not in ("0", "non", "false"),
+    )
+
+
+# nom -> fonction(plateau, joueur, rng, **options) -> coup (x, y) ou None
+MOTEURS = {
+    "minimax": _coup_minimax,
+    "aleatoire": _coup_aleatoire,
+}
+
+# Moteurs avec un état d'un coup à l'autre:
+# nom -> fabrique(**options) -> fonction(plateau, joueur, rng) -> coup, appelée une fois par partie
+FABRIQUES = {
+    "mcts": _moteur_mcts,
+}
+
+
+def lire_moteur(description):
+    """
+    Analyse « nom[:option=valeur,...] ».
+
+    Returns:
+        Tuple (nom, options)
+    """
+    nom, _, reste = description.partition(":")
+    if nom not in MOTEURS and nom not in FABRIQUES:
+        raise ValueError(f"Moteur inconnu: {nom} (choix: {', '.join([*MOTEURS, *FABRIQUES])})")
+    options = {}
+    for option in filter(None, reste.split(",")):
+        cle, egal, valeur = option.partition("=")
+        if not egal:
+            raise ValueError(f"Option invalide pour {nom}: {option}")
+        options[cle] = valeur
+    return nom, options
+
+
+# -----------------------
+# PARTIE
+# -----------------------
+def jouer_partie(moteurs, graine, size=BOARD_SIZE, coups_max=COUPS_MAX):
+    """
+    Joue une partie complète entre les moteurs donnés (un par place).
+
+    Args:
+        moteurs: Descriptions des moteurs, dans l'ordre des places (joueur 1, 2...)
+        graine: Graine de la partie (placement initial, moteurs aléatoires)
+        size: Taille du plateau
+        coups_max: Nombre de coups au-delà duquel la partie est nulle
+
+    Returns:
+        Dict du résultat (une ligne du fichier JSONL)
+    """
+    rng = Random(graine)
+    minimax.vider_cache()
+    plateau = create_board(size)
+    nb_joueurs = len(moteurs)
+    fonctions = []
+    for description in moteurs:
+        nom, options = lire_moteur(description)
+        if nom in FABRIQUES:
+            fonctions.append((FABRIQUES[nom](**options), {}))
+        else:
+            fonctions.append((MOTEURS[nom], options))
+
+    # Placement initial aléatoire, comme les bots de l'interface
+    for joueur in range(1, nb_joueurs + 1):
+        while not placer_jeton_initial(plateau, rng.randrange(size), rng.randrange(size), joueur):
+            pass
+
+    debut = time.perf_counter()
+    temps_moteurs = [0.0] * nb_joueurs
+    forfaits = []
+    joueur = 1
+    coups = 0
+    gagnant = None
+    while coups < coups_max:
+        hors_jeu = {f["joueur"] for f in forfaits}
+        en_vie = [j for j in range(1, nb_joueurs + 1) if not joueur_a_perdu(plateau, j) and j not in hors_jeu]
+        if len(en_vie) == 1:
+            gagnant = en_vie[0]
+            break
+        if joueur in en_vie:
+            fonction, options = fonctions[joueur - 1]
+            t = time.perf_counter()
+            try:
+                coup = fonction(plateau, joueur, rng, **options)
+                raison = None if coup is not None else "aucun coup"
+            except Exception as erreur:
+                coup = None
+                raison = f"{type(erreur).__name__}: {erreur}"
+            temps_moteurs[joueur - 1] += time.perf_counter() - t
+            if raison is None and not jouer_coup(plateau, coup[0], coup[1], joueur):
+                raison = f"coup invalide {list(coup)}"
+            if raison is None:
+                coups += 1
+            else:
+                # Forfait: la place ne joue plus, la partie continue sans elle
+                forfaits.append({"joueur": joueur, "moteur": moteurs[joueur - 1], "raison": raison})
+        joueur = joueur % nb_joueurs + 1
+
+    return {
+        "graine": graine,
+        "taille": size,
+        "moteurs": list(moteurs),
+        "gagnant": gagnant,
+        "moteur_gagnant": moteurs[gagnant - 1] if gagnant else None,
+        "coups": coups,
+        "duree": round(time.perf_counter() - debut, 4),
+        "temps_moteurs": [round(t, 4) for t in temps_moteurs],
+        "forfaits": forfaits,
+    }
+
+
+def places(moteurs, nb_joueurs, indice):
+    """
+    Moteurs de la partie numéro indice, dans l'ordre des places.
+
+    Les parties parcourent toutes les dispositions de nb_joueurs moteurs
+    distincts: chaque paire joue dans chaque ordre, à chaque écart de places.
+    Avec moins de moteurs que de places, un moteur occupe plusieurs places
+    et la liste tourne d'une partie à l'autre.
+    """
+    if len(moteurs) < nb_joueurs:
+        return [moteurs[(indice + place) % len(moteurs)] for place in range(nb_joueurs)]
+    dispositions = list(permutations(moteurs, nb_joueurs))
+    return list(dispositions[indice % len(dispositions)])
+
+
+# -----------------------
+# STATISTIQUES
+# -----------------------
+def elo(score):
+    """Écart Elo correspondant à un score moyen (±inf pour 0 et 1)"""
+    if score <= 0:
+        return float('-inf')
+    if score >= 1:
+        return float('inf')
+    return -400 * math.log10(1 / score - 1)
+
+
+def confrontation(resultats, a, b, z=1.96):
+    """
+    Bilan de a contre b sur les parties où les deux ont joué.
+
+    Une partie gagnée par un troisième moteur compte comme nulle entre a et b.
+
+    Returns:
+        Dict {parties, victoires, defaites, nulles, score, elo, elo_min, elo_max}
+        (intervalle de confiance à 95% par défaut), ou None sans partie commune
+    """
+    victoires = defaites = nulles = 0
+    for resultat in resultats:
+        if a not in resultat["moteurs"] or b not in resultat["moteurs"]:
+            continue
+        if resultat["moteur_gagnant"] == a:
+            victoires += 1
+        elif resultat["moteur_gagnant"] == b:
+            defaites += 1
+        else:
+            nulles += 1
+    n = victoires + defaites + nulles
+    if n == 0:
+        return None
+    score = (victoires + 0.5 * nulles) / n
+    # Écart type du score moyen, estimé à partir des résultats observés
+    variance = (victoires * (1 - score) ** 2 + defaites * score ** 2 + nulles * (0.5 - score) ** 2) / n
+    marge = z * math.sqrt(variance / n)
+    return {
+        "parties": n,
+        "victoires": victoires,
+        "defaites": defaites,
+        "nulles": nulles,
+        "score": score,
+        "elo": elo(score),
+        "elo_min": elo(score - marge),
+        "elo_max": elo(score + marge),
+    }
+
+
+def afficher_bilan(resultats, moteurs, flux=sys.stdout):
+    """Affiche les taux de victoire par moteur et l'Elo de chaque paire"""
+    print(f"\n{len(resultats)} parties", file=flux)
+    for moteur in moteurs:
+        jouees = sum(1 for r in resultats if moteur in r["moteurs"])
+        gagnees = sum(1 for r in resultats if r["moteur_gagnant"] == moteur)
+        taux = gagnees / jouees if jouees else 0.0
+        forfaits = sum(1 for r in resultats for f in r.get("forfaits", ()) if f["moteur"] == moteur)
+        print(f"  {moteur}: {gagnees}/{jouees} victoires ({100 * taux:.1f}%)"
+              + (f", {forfaits} forfait(s)" if forfaits else ""), file=flux)
+    for a, b in combinations(moteurs, 2):
+        bilan = confrontation(resultats, a, b)
+        if bilan is None:
+            continue
+        print(
+            f"  {a} contre {b}: +{bilan['victoires']} -{bilan['defaites']} ={bilan['nulles']}"
+            f"  Elo {bilan['elo']:+.0f} [{bilan['elo_min']:+.0f}, {bilan['elo_max']:+.0f}]",
+            file=flux,
+        )
+
+
+# -----------------------
+# LIGNE DE COMMANDE
+# -----------------------
+def lancer_arene(moteurs, nb_parties, nb_joueurs=2, graine=0, size=BOARD_SIZE,
+                 coups_max=COUPS_MAX, nb_processus=None, sortie=None):
+    """
+    Joue nb_parties parties sur un pool de processus.
+
+    Les résultats sont écrits dans sortie (JSONL) au fur et à mesure qu'ils
+    arrivent, dans l'ordre de fin des parties.
+
+    Returns:
+        La liste des résultats, triée par numéro de partie
+    """
+    for description in moteurs:
+        lire_moteur(description)  # Erreur immédiate plutôt que dans les processus
+    fichier = open(sortie, "a", encoding="utf-8") if sortie else None
+    resultats = []
+    try:
+        with ProcessPoolExecutor(max_workers=nb_processus or os.cpu_count() or 1) as pool:
+            futurs = {
+                pool.submit(jouer_partie, places(moteurs, nb_joueurs, i), graine + i, size, coups_max): i
+                for i in range(nb_parties)
+            }
+            for futur in as_completed(futurs):
+                try:
+                    resultat = {"partie": futurs[futur], **futur.result()}
+                except Exception as erreur:
+                    # Une partie perdue (processus tué...) n'annule pas les autres
+                    print(f"Partie {futurs[futur]} abandonnée: {type(erreur).__name__}: {erreur}",
+                          file=sys.stderr)
+                    continue
+                resultats.append(resultat)
+                if fichier:
+                    fichier.write(json.dumps(resultat, ensure_ascii=False) + "\n")
+                    fichier.flush()
+    finally:
+        if fichier:
+            fichier.close()
+    resultats.sort(key=lambda r: r["partie"])
+    return resultats
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Parties bot contre bot sans interface")
+    parser.add_argument("moteurs", nargs="+", help="Moteurs: nom[:option=valeur,...], ex. minimax:profondeur=3")
+    parser.add_argument("--parties", type=int, default=100, help="Nombre de parties")
+    parser.add_argument("--joueurs", type=int, default=2, help="Joueurs par partie (2 à 4)")
+    parser.add_argument("--graine", type=int, default=0, help="Graine de la première partie")
+    parser.add_argument("--taille", type=int, default=BOARD_SIZE, help="Taille du plateau")
+    parser.add_argument("--coups-max", type=int, default=COUPS_MAX, help="Coups avant partie nulle")
+    parser.add_argument("--processus", type=int, default=None, help="Taille du pool (défaut: nombre de cœurs)")
+    parser.add_argument("--sortie", default=None, help="Fichier JSONL des résultats (ajout)")
+    args = parser.parse_args(arguments)
+
+    if not 2 <= args.joueurs <= 4:
+        parser.error("--joueurs doit être entre 2 et 4")
+    moteurs = list(dict.fromkeys(args.moteurs))
+    if len(moteurs) != len(args.moteurs):
+        parser.error("chaque moteur ne doit apparaître qu'une fois")
+    try:
+        resultats = lancer_arene(moteurs, args.parties, args.joueurs, args.graine, args.taille,
+                                 args.coups_max, args.processus, args.sortie)
+    except ValueError as erreur:
+        parser.error(str(erreur))
+    afficher_bilan(resultats, moteurs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+"""
+Banc d'essai des performances sur un corpus fixe de positions.
+
+    python bench.py lancer --sortie avant.json
+    python bench.py comparer avant.json apres.json --seuil 0.10
+    python bench.py verifier
+
+Mesures, séparées:
+- perft: nombre de feuilles de l'arbre des coups légaux jusqu'à une
+  profondeur donnée (coups_possibles + jouer_coup + annuler_coup). Le nombre
+  de feuilles ne doit jamais changer: un écart signale un changement de règles
+- evaluation: appels de evaluer_position (l'évaluation de la recherche) par seconde
+- minimax: nœuds par seconde et temps pour atteindre chaque profondeur
+
+Le corpus (bench_positions.json) contient des ouvertures, des milieux de
+partie et des finales chargées en cases à 3 jetons (réactions en chaîne).
+Il est stocké octet par octet pour ne pas dépendre des règles du moment;
+`python bench.py corpus` le régénère.
+
+`python bench.py verifier` contrôle que les variantes rapides (bitboard,
+evaluation_numpy) donnent exactement les résultats de game et de minimax,
+sur des positions de parties aléatoires (plateaux_aleatoires), et qu'une
+recherche plus profonde que minimax.PROFONDEUR_LIMITE aboutit.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from random import Random
+
+import game
+import minimax
+from game import (
+    create_board, placer_jeton_initial, jouer_coup, annuler_coup, coups_possibles,
+    joueur_suivant, plateau_depuis_octets, MAX_JOUEURS
+)
+
+FICHIER_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_positions.json")
+
+# Profondeurs par défaut (perft, minimax)
+PROFONDEUR_PERFT = 3
+PROFONDEUR_MINIMAX = 5
+
+# Nombre d'appels de evaluer_position mesurés
+APPELS_EVALUATION = 200_000
+
+# Chaque mesure de temps est répétée; on garde la plus rapide (la moins bruitée)
+REPETITIONS = 3
+
+# Écart relatif toléré par défaut en mode comparaison
+SEUIL_REGRESSION = 0.10
+
+# Budget d'explosions (game.PAS_EXPLOSION_MAX) des vérifications de cascades bornées
+PAS_EXPLOSION_VERIFIE = 2
+
+
+# -----------------------
+# CORPUS
+# -----------------------
+def charger_corpus(fichier=FICHIER_CORPUS):
+    """
+    Lit le corpus de positions.
+
+    Returns:
+        Liste de dicts {nom, categorie, nb_joueurs, joueur, plateau}
+    """
+    with open(fichier, encoding="utf-8") as f:
+        entrees = json.load(f)
+    positions = []
+    for entree in entrees:
+        plateau = plateau_depuis_octets(bytes.fromhex(entree["cases"]), entree["taille"])
+        positions.append({
+            "nom": entree["nom"],
+            "categorie": entree["categorie"],
+            "nb_joueurs": entree["nb_joueurs"],
+            "joueur": entree["joueur"],
+            "plateau": plateau,
+        })
+    return positions
+
+
+def partie_aleatoire(rng, nb_joueurs, nb_coups, size=10, proba_critique=0.0):
+    """
+    Placement puis nb_coups coups au hasard. Avec une probabilité
+    proba_critique, le coup est pris parmi les cases à 3 jetons du joueur
+    s'il en a: les positions sont alors chargées en cascades.
+
+    Returns:
+        (plateau, joueur au trait), ou None si la partie s'est finie avant
+    """
+    plateau = create_board(size)
+    for joueur in range(1, nb_joueurs + 1):
+        while not placer_jeton_initial(plateau, rng.randrange(size), rng.randrange(size), joueur):
+            pass
+    joueur = 1
+    for _ in range(nb_coups):
+        coups = coups_possibles(plateau, joueur)
+        if proba_critique:
+            critiques = [(x, y) for x, y in coups if plateau.cases[2 * (x * size + y) + 1] == 3]
+            if critiques and rng.random() < proba_critique:
+                coups = critiques
+        jouer_coup(plateau, *rng.choice(coups), joueur)
+        suivant = joueur_suivant(plateau, joueur)
+        if suivant == joueur:
+            return None
+        joueur = suivant
+    return plateau, joueur
+
+
+def plateaux_aleatoires(nb, graine, nb_joueurs, nb_coups_max, size=10, proba_critique=0.0):
+    """
+    nb positions de parties aléatoires (partie_aleatoire) de 0 à
+    nb_coups_max - 1 coups; les parties finies sont écartées.
+
+    Returns:
+        Liste de (plateau, joueur au trait)
+    """
+    rng = Random(graine)
+    positions = []
+    while len(positions) < nb:
+        position = partie_aleatoire(rng, nb_joueurs, rng.randrange(nb_coups_max), size, proba_critique)
+        if position is not None:
+            positions.append(position)
+    return positions
+
+
+def generer_corpus(fichier=FICHIER_CORPUS, graine=2024):
+    """Régénère le corpus: ouvertures, milieux de partie, finales explosives"""
+    rng = Random(graine)
+    entrees = []
+
+    def ajouter(nom, categorie, nb_joueurs, plateau, joueur):
+        entrees.append({
+            "nom": nom,
+            "categorie": categorie,
+            "taille": plateau.size,
+            "nb_joueurs": nb_joueurs,
+            "joueur": joueur,
+            "cases": bytes(plateau.cases).hex(),
+        })
+
+    for nom, nb_joueurs, nb_coups in (("ouverture_2j_a", 2, 4), ("ouverture_2j_b", 2, 10),
+                                      ("ouverture_3j", 3, 9), ("ouverture_4j", 4, 12)):
+        position = None
+        while position is None:
+            position = partie_aleatoire(rng, nb_joueurs, nb_coups)
+        ajouter(nom, "ouverture", nb_joueurs, *position)
+
+    for nom, nb_joueurs, nb_coups in (("milieu_2j_a", 2, 30), ("milieu_2j_b", 2, 50),
+                                      ("milieu_3j", 3, 45)):
+        position = None
+        while position is None:
+            position = partie_aleatoire(rng, nb_joueurs, nb_coups)
+        ajouter(nom, "milieu", nb_joueurs, *position)
+
+    # Finales: parmi des positions tardives, celles qui ont le plus de cases à 3 jetons
+    for nom in ("finale_2j_a", "finale_2j_b", "finale_2j_c"):
+        meilleure, critiques_max = None, -1
+        for _ in range(40):
+            position = partie_aleatoire(rng, 2, rng.randrange(60, 140))
+            if position is None:
+                continue
+            plateau = position[0]
+            critiques = plateau.comptes[4 * 1 + 3] + plateau.comptes[4 * 2 + 3]
+            if critiques > critiques_max:
+                meilleure, critiques_max = position, critiques
+        ajouter(nom, "finale", 2, *meilleure)
+
+    with open(fichier, "w", encoding="utf-8") as f:
+        json.dump(entrees, f, indent=1)
+        f.write("\n")
+    return entrees
+
+
+# -----------------------
+# MESURES
+# -----------------------
+def perft(plateau, joueur, profondeur):
+    """
+    Nombre de feuilles de l'arbre des coups à la profondeur donnée.
+
+    Une position où la partie est finie compte comme une feuille.
+    """
+    if profondeur == 0:
+        return 1
+    total = 0
+    journal = []
+    for x, y in coups_possibles(plateau, joueur):
+        if not jouer_coup(plateau, x, y, joueur, journal=journal):
+            continue
+        suivant = joueur_suivant(plateau, joueur)
+        total += 1 if suivant == joueur else perft(plateau, suivant, profondeur - 1)
+        annuler_coup(plateau, journal)
+    return total
+
+
+def mesurer_perft(positions, profondeur=PROFONDEUR_PERFT, repetitions=REPETITIONS):
+    resultats = {}
+    for position in positions:
+        plateau = position["plateau"].copie()
+        secondes = float('inf')
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            noeuds = perft(plateau, position["joueur"], profondeur)
+            secondes = min(secondes, time.perf_counter() - debut)
+        resultats[position["nom"]] = {
+            "profondeur": profondeur,
+            "noeuds": noeuds,
+            "secondes": secondes,
+            "nps": noeuds / secondes if secondes else 0.0,
+        }
+    return resultats
+
+
+def mesurer_evaluation(positions, appels=APPELS_EVALUATION, repetitions=REPETITIONS):
+    plateaux = [(p["plateau"], p["joueur"]) for p in positions]
+    tours = max(1, appels // len(plateaux))
+    evaluer = minimax.evaluer_position
+    secondes = float('inf')
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for _ in range(tours):
+            for plateau, joueur in plateaux:
+                evaluer(plateau, joueur)
+        secondes = min(secondes, time.perf_counter() - debut)
+    total = tours * len(plateaux)
+    return {"appels": total, "secondes": secondes, "par_seconde": total / secondes if secondes else 0.0}
+
+
+def mesurer_minimax(positions, profondeur=PROFONDEUR_MINIMAX, repetitions=REPETITIONS):
+    """
+    Pour chaque position et chaque profondeur p <= profondeur, une recherche
+    à table vide: temps pour atteindre p et nœuds explorés.
+    """
+    resultats = {}
+    for position in positions:
+        temps = []
+        noeuds = []
+        coup = stats = None
+        for p in range(1, profondeur + 1):
+            secondes = float('inf')
+            for _ in range(repetitions):
+                minimax.vider_cache()
+                debut = time.perf_counter()
+                # Sans résolution exacte: on mesure la recherche elle-même, finales comprises
+                coup, stats = minimax.rechercher(position["plateau"], position["joueur"], profondeur=p,
+                                                 resoudre_finale=False)
+                secondes = min(secondes, time.perf_counter() - debut)
+            temps.append(secondes)
+            noeuds.append(stats.noeuds_explores)
+        resultats[position["nom"]] = {
+            "profondeur": profondeur,
+            "noeuds": noeuds[-1],
+            "secondes": temps[-1],
+            "nps": noeuds[-1] / temps[-1] if temps[-1] else 0.0,
+            "temps_par_profondeur": temps,
+            "noeuds_par_profondeur": noeuds,
+            "coup": list(coup) if coup else None,
+            "stats": stats.vers_dict(),
+        }
+    return resultats
+
+
+def lancer(profondeur_perft=PROFONDEUR_PERFT, profondeur_minimax=PROFONDEUR_MINIMAX,
+           appels=APPELS_EVALUATION, fichier_corpus=FICHIER_CORPUS, categories=None,
+           repetitions=REPETITIONS):
+    """Lance toutes les mesures; retourne le rapport (sérialisable en JSON)"""
+    positions = charger_corpus(fichier_corpus)
+    if categories:
+        positions = [p for p in positions if p["categorie"] in categories]
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "parametres": {
+            "profondeur_perft": profondeur_perft,
+            "profondeur_minimax": profondeur_minimax,
+            "appels_evaluation": appels,
+            "repetitions": repetitions,
+            "positions": [p["nom"] for p in positions],
+        },
+        "perft": mesurer_perft(positions, profondeur_perft, repetitions),
+        "evaluation": mesurer_evaluation(positions, appels, repetitions),
+        "minimax": mesurer_minimax(positions, profondeur_minimax, repetitions),
+    }
+
+
+# -----------------------
+# COMPARAISON
+# -----------------------
+def comparer(ancien, nouveau, seuil=SEUIL_REGRESSION):
+    """
+    Compare deux rapports.
+
+    Sont signalés: tout écart de nombre de feuilles perft (règles changées),
+    une baisse de vitesse (perft, evaluation, minimax) ou une hausse du temps
+    pour atteindre une profondeur ou du nombre de nœuds minimax de plus de
+    seuil (relatif).
+
+    Returns:
+        Tuple (lignes du rapport, liste des régressions)
+    """
+    lignes = []
+    regressions = []
+
+    def ecart(avant, apres):
+        return (apres - avant) / avant if avant else 0.0
+
+    def noter(nom, avant, apres, plus_haut_meilleur):
+        variation = ecart(avant, apres)
+        mauvais = -variation if plus_haut_meilleur else variation
+        statut = "RÉGRESSION" if mauvais > seuil else ""
+        ligne = f"{nom:<45} {avant:>12.4g} -> {apres:<12.4g} {100 * variation:+7.1f}% {statut}"
+        lignes.append(ligne)
+        if statut:
+            regressions.append(ligne)
+
+    for nom, apres in nouveau["perft"].items():
+        avant = ancien["perft"].get(nom)
+        if avant is None or avant["profondeur"] != apres["profondeur"]:
+            continue
+        if avant["noeuds"] != apres["noeuds"]:
+            ligne = f"perft {nom}: {avant['noeuds']} feuilles -> {apres['noeuds']} (règles modifiées?)"
+            lignes.append(ligne)
+            regressions.append(ligne)
+        noter(f"perft {nom} (feuilles/s)", avant["nps"], apres["nps"], True)
+
+    noter("evaluation (appels/s)", ancien["evaluation"]["par_seconde"],
+          nouveau["evaluation"]["par_seconde"], True)
+
+    for nom, apres in nouveau["minimax"].items():
+        avant = ancien["minimax"].get(nom)
+        if avant is None:
+            continue
+        communes = min(len(avant["temps_par_profondeur"]), len(apres["temps_par_profondeur"]))
+        p = communes - 1
+        if p < 0:
+            continue
+        noter(f"minimax {nom} (nœuds/s)", avant["nps"], apres["nps"], True)
+        noter(f"minimax {nom} (nœuds, prof. {p + 1})",
+              avant["noeuds_par_profondeur"][p], apres["noeuds_par_profondeur"][p], False)
+        noter(f"minimax {nom} (secondes, prof. {p + 1})",
+              avant["temps_par_profondeur"][p], apres["temps_par_profondeur"][p], False)
+    return lignes, regressions
+
+
+# -----------------------
+# VÉRIFICATION
+# -----------------------
+def verifier_bitboards(nb=300, graine=0, fichier=FICHIER_CORPUS):
+    """
+    Compare bitboard à game et à minimax.evaluer_position (requêtes et coups,
+    arrêt anticipé ou non, cascade complète ou bornée) sur des positions
+    aléatoires, puis son perft à celui de game sur le corpus.
+
+    Returns:
+        Le nombre de comparaisons (lève AssertionError en cas d'écart)
+    """
+    import bitboard
+
+    ancien = game.PAS_EXPLOSION_MAX
+    compares = 0
+    for nb_joueurs in (2, 3, 4):
+        for plateau, trait in plateaux_aleatoires(nb, graine + nb_joueurs, nb_joueurs, 150, proba_critique=0.5):
+            bits = bitboard.depuis_plateau(plateau)
+            assert bitboard.vers_octets(bits) == bytes(plateau.cases)
+            for joueur in range(1, MAX_JOUEURS + 1):
+                k = 4 * joueur
+                for vide in (False, True):
+                    assert bitboard.coups_possibles(bits, joueur, vide) == coups_possibles(plateau, joueur, vide)
+                assert bitboard.compter_jetons(bits, joueur) == plateau.jetons_joueur[joueur]
+                assert bitboard.comptes_cases(bits, joueur) == tuple(plateau.comptes[k + 1:k + 4])
+                assert bitboard.chaines(bits, joueur) == plateau.chaines[joueur]
+                assert bitboard.evaluer_position(bits, joueur) == minimax.evaluer_position(plateau, joueur)
+                compares += 5
+            for pas_max in (None, PAS_EXPLOSION_VERIFIE):
+                game.PAS_EXPLOSION_MAX = pas_max
+                try:
+                    for x, y in coups_possibles(plateau, trait, True):
+                        for arret in (True, False):
+                            attendu = plateau.copie()
+                            valide = jouer_coup(attendu, x, y, trait, arret_elimination=arret)
+                            enfant = bits.copie()
+                            assert bitboard.jouer_coup(enfant, x, y, trait, arret_elimination=arret) == valide
+                            assert bitboard.vers_octets(enfant) == bytes(attendu.cases), (x, y, trait, arret, pas_max)
+                            compares += 1
+                finally:
+                    game.PAS_EXPLOSION_MAX = ancien
+    for position in charger_corpus(fichier):
+        plateau, joueur = position["plateau"], position["joueur"]
+        feuilles = bitboard.perft(bitboard.depuis_plateau(plateau), joueur, PROFONDEUR_PERFT)
+        attendu = perft(plateau.copie(), joueur, PROFONDEUR_PERFT)
+        assert feuilles == attendu, (position["nom"], feuilles, attendu)
+        compares += 1
+    return compares
+
+
+def verifier_evaluation_numpy(nb=500, graine=0):
+    """
+    Compare evaluer_plateaux à evaluer_plateau et evaluer_position,
+    developper_enfants à jouer_coup, et scores_frontiere (cascade bornée par
+    game.PAS_EXPLOSION_MAX) à jouer_coup puis evaluer_position, sur des
+    positions aléatoires.
+
+    Returns:
+        Le nombre de comparaisons (lève AssertionError en cas d'écart)
+    """
+    import evaluation_numpy
+
+    ancien = game.PAS_EXPLOSION_MAX
+    compares = 0
+    for nb_joueurs in (2, 3, 4):
+        plateaux = [plateau for plateau, _ in plateaux_aleatoires(nb, graine + nb_joueurs, nb_joueurs, 120)]
+        lot = evaluation_numpy.plateaux_vers_lot(plateaux)
+        for joueur_id in range(1, nb_joueurs + 1):
+            for adversaire_id in range(1, nb_joueurs + 1):
+                if joueur_id == adversaire_id:
+                    continue
+                scores = evaluation_numpy.evaluer_plateaux(lot, joueur_id, adversaire_id)
+                for plateau, score in zip(plateaux, scores):
+                    attendu = minimax.evaluer_plateau(plateau, joueur_id, adversaire_id)
+                    assert score == attendu, (joueur_id, adversaire_id, score, attendu)
+                    compares += 1
+            scores = evaluation_numpy.evaluer_plateaux(lot, joueur_id)
+            for plateau, score in zip(plateaux, scores):
+                attendu = minimax.evaluer_position(plateau, joueur_id)
+                assert score == attendu, (joueur_id, score, attendu)
+                compares += 1
+            for plateau in plateaux[:50]:
+                coups = coups_possibles(plateau, joueur_id)
+                lot_enfants, valides = evaluation_numpy.developper_enfants(plateau, coups, joueur_id)
+                for enfant, i in zip(lot_enfants, valides):
+                    attendu = plateau.copie()
+                    jouer_coup(attendu, *coups[i], joueur_id)
+                    assert enfant.tobytes() == bytes(attendu.cases), coups[i]
+                    compares += 1
+            game.PAS_EXPLOSION_MAX = PAS_EXPLOSION_VERIFIE
+            try:
+                for plateau in plateaux[:50]:
+                    coups = coups_possibles(plateau, joueur_id)
+                    scores = evaluation_numpy.scores_frontiere(plateau, coups, joueur_id, joueur_id)
+                    for coup, score in zip(coups, scores):
+                        enfant = plateau.copie()
+                        jouer_coup(enfant, *coup, joueur_id)
+                        attendu = minimax.evaluer_position(enfant, joueur_id)
+                        assert score == attendu, (coup, score, attendu)
+                        compares += 1
+            finally:
+                game.PAS_EXPLOSION_MAX = ancien
+    return compares
+
+
+def verifier_profondeur_limite(fichier=FICHIER_CORPUS):
+    """
+    Recherches sans budget plus profondes que minimax.PROFONDEUR_LIMITE
+    (abaissée le temps du contrôle), en séquentiel et en parallèle.
+
+    Returns:
+        Le nombre de recherches (lève une exception en cas d'échec)
+    """
+    import parallele
+
+    limite = minimax.PROFONDEUR_LIMITE
+    minimax.PROFONDEUR_LIMITE = 1
+    recherches = 0
+    try:
+        for position in charger_corpus(fichier)[:3]:
+            for nb_workers in (None, 2):
+                minimax.vider_cache()
+                coup, stats = minimax.rechercher(position["plateau"], position["joueur"], profondeur=3,
+                                                 nb_workers=nb_workers, resoudre_finale=False)
+                assert coup is not None and stats.profondeur == 3, (position["nom"], nb_workers)
+                recherches += 1
+    finally:
+        minimax.PROFONDEUR_LIMITE = limite
+        parallele.fermer_pool()
+    return recherches
+
+
+# -----------------------
+# LIGNE DE COMMANDE
+# -----------------------
+def _afficher(rapport):
+    for nom, r in rapport["perft"].items():
+        print(f"perft   {nom:<16} prof {r['profondeur']} {r['noeuds']:>9} feuilles "
+              f"{r['secondes']:7.2f}s {r['nps']:>10.0f}/s")
+    e = rapport["evaluation"]
+    print(f"eval    {e['appels']} appels {e['secondes']:.2f}s {e['par_seconde']:.0f}/s")
+    for nom, r in rapport["minimax"].items():
+        temps = " ".join(f"{t:.3f}" for t in r["temps_par_profondeur"])
+        print(f"minimax {nom:<16} prof {r['profondeur']} {r['noeuds']:>9} nœuds "
+              f"{r['nps']:>10.0f}/s  temps/prof: {temps}")
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des performances")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    p_lancer = commandes.add_parser("lancer", help="Mesurer et écrire un rapport JSON")
+    p_lancer.add_argument("--sortie", default=None, help="Fichier JSON du rapport")
+    p_lancer.add_argument("--perft", type=int, default=PROFONDEUR_PERFT, help="Profondeur perft")
+    p_lancer.add_argument("--minimax", type=int, default=PROFONDEUR_MINIMAX, help="Profondeur minimax")
+    p_lancer.add_argument("--appels", type=int, default=APPELS_EVALUATION, help="Appels d'évaluation")
+    p_lancer.add_argument("--repetitions", type=int, default=REPETITIONS, help="Répétitions par mesure")
+    p_lancer.add_argument("--categories", nargs="*", help="ouverture, milieu et/ou finale")
+    p_lancer.add_argument("--corpus", default=FICHIER_CORPUS, help="Fichier du corpus")
+
+    p_comparer = commandes.add_parser("comparer", help="Comparer deux rapports")
+    p_comparer.add_argument("ancien")
+    p_comparer.add_argument("nouveau")
+    p_comparer.add_argument("--seuil", type=float, default=SEUIL_REGRESSION,
+                            help="Écart relatif toléré (0.10 = 10%%)")
+
+    p_verifier = commandes.add_parser("verifier", help="Contrôles de parité et de cohérence")
+    p_verifier.add_argument("--graine", type=int, default=0)
+
+    p_corpus = commandes.add_parser("corpus", help="Régénérer le corpus de positions")
+    p_corpus.add_argument("--graine", type=int, default=2024)
+
+    args = parser.parse_args(arguments)
+
+    if args.commande == "lancer":
+        rapport = lancer(args.perft, args.minimax, args.appels, args.corpus, args.categories,
+                         args.repetitions)
+        _afficher(rapport)
+        if args.sortie:
+            with open(args.sortie, "w", encoding="utf-8") as f:
+                json.dump(rapport, f, indent=1)
+        return 0
+
+    if args.commande == "comparer":
+        with open(args.ancien, encoding="utf-8") as f:
+            ancien = json.load(f)
+        with open(args.nouveau, encoding="utf-8") as f:
+            nouveau = json.load(f)
+        lignes, regressions = comparer(ancien, nouveau, args.seuil)
+        print("\n".join(lignes))
+        print(f"\n{len(regressions)} régression(s)")
+        return 1 if regressions else 0
+
+    if args.commande == "verifier":
+        print(f"bitboard: parité vérifiée, {verifier_bitboards(graine=args.graine)} comparaisons")
+        try:
+            compares = verifier_evaluation_numpy(graine=args.graine)
+        except ImportError:
+            print("evaluation_numpy: NumPy absent, non vérifiée")
+        else:
+            print(f"evaluation_numpy: parité vérifiée, {compares} comparaisons")
+        print(f"minimax: {verifier_profondeur_limite()} recherches au-delà de PROFONDEUR_LIMITE")
+        return 0
+
+    entrees = generer_corpus(graine=args.graine)
+    print(f"{len(entrees)} positions écrites dans {FICHIER_CORPUS}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
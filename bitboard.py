@@ -0,0 +1,333 @@
+"""
+Plateau en bitboards: un entier Python par ensemble de cases.
+
+Le bit i d'un masque correspond à la case (x, y), i = x * size + y, comme
+dans Plateau.cases. Le plateau tient un masque par joueur et deux plans de
+bits pour le nombre de jetons (jetons = bit0 + 2 * bit1, de 1 à 3 sur une
+case occupée, 0 sur une case vide). Génération des coups, élimination,
+cases critiques et évaluation se calculent par quelques opérations sur ces
+masques, sans boucle par case.
+
+Une explosion en chaîne se déroule par vagues: toutes les cases critiques
+touchées explosent ensemble, leurs voisins sont obtenus par décalages et
+chaque voisin reçoit un jeton par additionneur « bit-sliced ». Le résultat
+d'une cascade complète ne dépend pas de l'ordre des explosions (c'est un
+tas de sable abélien): il est identique à celui de game.explosion. Seul
+l'arrêt anticipé quand tous les adversaires sont éliminés dépend de l'ordre:
+ces coups sont rejoués par game.jouer_coup. De même pour toute explosion
+quand game.PAS_EXPLOSION_MAX borne la cascade.
+
+Les règles supposées sont celles de game: MASSE_CRITIQUE = 4 pour toutes les
+cases (deux plans de bits suffisent). Construire un PlateauBits avec une
+autre masse critique lève ValueError.
+"""
+from typing import Dict, List, Tuple
+
+import game
+from game import (
+    Plateau, jouer_coup as jouer_coup_plateau, plateau_depuis_octets, joueur_suivant, MAX_JOUEURS
+)
+from minimax import BONUS_CASE_1, BONUS_CASE_2, BONUS_CASE_3, BONUS_CHAINE, MALUS_MENACE
+
+# Masques propres à une taille: (plein, sans colonne y = 0, sans colonne y = size - 1)
+_tables_masques: Dict[int, Tuple[int, int, int]] = {}
+
+# Seule masse critique représentable: jetons de 1 à 3 sur deux plans de bits
+MASSE_CRITIQUE_BITS = 4
+
+
+def verifier_regles():
+    """Lève ValueError si les règles de game ne sont pas celles que les bitboards représentent"""
+    if game.MASSE_CRITIQUE != MASSE_CRITIQUE_BITS:
+        raise ValueError(f"bitboard ne gère que game.MASSE_CRITIQUE = {MASSE_CRITIQUE_BITS} "
+                         f"(et non {game.MASSE_CRITIQUE})")
+
+
+def masques_bords(size: int) -> Tuple[int, int, int]:
+    """
+    Retourne (plein, sans_premiere, sans_derniere): toutes les cases, les
+    cases hors de la colonne y = 0, les cases hors de la colonne y = size - 1.
+    """
+    table = _tables_masques.get(size)
+    if table is None:
+        verifier_regles()
+        plein = (1 << (size * size)) - 1
+        premiere = sum(1 << (x * size) for x in range(size))
+        derniere = premiere << (size - 1)
+        table = (plein, plein & ~premiere, plein & ~derniere)
+        _tables_masques[size] = table
+    return table
+
+
+class PlateauBits:
+    """
+    Plateau en bitboards.
+
+    - joueurs[j]: masque des cases du joueur j (joueurs[0] inutilisé, nul)
+    - bit0, bit1: plans de bits du nombre de jetons de chaque case
+    """
+    __slots__ = ("size", "joueurs", "bit0", "bit1")
+
+    def __init__(self, size: int):
+        verifier_regles()
+        self.size = size
+        self.joueurs = [0] * (MAX_JOUEURS + 1)
+        self.bit0 = 0
+        self.bit1 = 0
+
+    def copie(self) -> "PlateauBits":
+        """Retourne une copie indépendante du plateau"""
+        nouveau = PlateauBits.__new__(PlateauBits)
+        nouveau.size = self.size
+        nouveau.joueurs = self.joueurs[:]
+        nouveau.bit0 = self.bit0
+        nouveau.bit1 = self.bit1
+        return nouveau
+
+    @property
+    def jetons_joueur(self) -> List[int]:
+        """Totaux de jetons par joueur, comme Plateau.jetons_joueur (en lecture seule)"""
+        return [compter_jetons(self, joueur) for joueur in range(MAX_JOUEURS + 1)]
+
+
+# -----------------------
+# CONVERSIONS
+# -----------------------
+def depuis_plateau(plateau: Plateau) -> PlateauBits:
+    """Construit le PlateauBits d'un Plateau"""
+    size = plateau.size
+    bits = PlateauBits(size)
+    joueurs = bits.joueurs
+    cases = plateau.cases
+    bit0 = bit1 = 0
+    for i in range(size * size):
+        joueur = cases[2 * i]
+        if joueur:
+            b = 1 << i
+            joueurs[joueur] |= b
+            jeton = cases[2 * i + 1]
+            if jeton & 1:
+                bit0 |= b
+            if jeton & 2:
+                bit1 |= b
+    bits.bit0 = bit0
+    bits.bit1 = bit1
+    return bits
+
+
+def vers_octets(bits: PlateauBits) -> bytes:
+    """Octets (joueur, jeton) par case, dans la disposition de Plateau.cases"""
+    n = bits.size * bits.size
+    cases = bytearray(2 * n)
+    for joueur in range(1, MAX_JOUEURS + 1):
+        m = bits.joueurs[joueur]
+        while m:
+            b = m & -m
+            cases[2 * (b.bit_length() - 1)] = joueur
+            m ^= b
+    jetons = cases[1::2]
+    for plan, valeur in ((bits.bit0, 1), (bits.bit1, 2)):
+        while plan:
+            b = plan & -plan
+            jetons[b.bit_length() - 1] += valeur
+            plan ^= b
+    cases[1::2] = jetons
+    return bytes(cases)
+
+
+def vers_plateau(bits: PlateauBits) -> Plateau:
+    """Reconstruit le Plateau (hash et totaux compris)"""
+    return plateau_depuis_octets(vers_octets(bits), bits.size)
+
+
+# -----------------------
+# REQUÊTES
+# -----------------------
+def _indices(m: int) -> List[int]:
+    """Indices des bits à 1 de m, par ordre croissant"""
+    indices = []
+    while m:
+        b = m & -m
+        indices.append(b.bit_length() - 1)
+        m ^= b
+    return indices
+
+
+def coups_possibles(bits: PlateauBits, joueur: int, autoriser_case_vide: bool = False) -> List[Tuple[int, int]]:
+    """Cases du joueur, plus les cases vides si autoriser_case_vide (comme game.coups_possibles)"""
+    m = bits.joueurs[joueur]
+    if autoriser_case_vide:
+        occupees = 0
+        for masque in bits.joueurs:
+            occupees |= masque
+        m |= masques_bords(bits.size)[0] & ~occupees
+    size = bits.size
+    return [divmod(i, size) for i in _indices(m)]
+
+
+def joueur_a_perdu(bits: PlateauBits, joueur: int) -> bool:
+    """Vérifie si un joueur n'a plus de cases"""
+    return not bits.joueurs[joueur]
+
+
+def compter_jetons(bits: PlateauBits, joueur: int) -> int:
+    """Compte le nombre total de jetons d'un joueur"""
+    m = bits.joueurs[joueur]
+    return (m & bits.bit0).bit_count() + 2 * (m & bits.bit1).bit_count()
+
+
+def cases_critiques(bits: PlateauBits, joueur: int) -> int:
+    """Masque des cases du joueur à 3 jetons (qui explosent au prochain jeton)"""
+    return bits.joueurs[joueur] & bits.bit0 & bits.bit1
+
+
+def comptes_cases(bits: PlateauBits, joueur: int) -> Tuple[int, int, int]:
+    """Nombre de cases du joueur à 1, 2 et 3 jetons (Plateau.comptes)"""
+    m = bits.joueurs[joueur]
+    bit0, bit1 = bits.bit0, bits.bit1
+    return ((m & bit0 & ~bit1).bit_count(), (m & bit1 & ~bit0).bit_count(),
+            (m & bit0 & bit1).bit_count())
+
+
+def _decalages(m: int, size: int) -> Tuple[int, int, int, int]:
+    """Les quatre masques des voisins (y + 1, y - 1, x + 1, x - 1) des cases de m"""
+    plein, sans_premiere, sans_derniere = masques_bords(size)
+    return ((m << 1) & sans_premiere, (m >> 1) & sans_derniere, (m << size) & plein, m >> size)
+
+
+def chaines(bits: PlateauBits, joueur: int) -> int:
+    """
+    Potentiel de chaîne (Plateau.chaines): pour chaque case du joueur à 3
+    jetons, nombre de ses voisins appartenant aussi au joueur.
+    """
+    critiques = cases_critiques(bits, joueur)
+    if not critiques:
+        return 0
+    return sum((critiques & d).bit_count() for d in _decalages(bits.joueurs[joueur], bits.size))
+
+
+def evaluer_position(bits: PlateauBits, joueur_id: int) -> int:
+    """Même score que minimax.evaluer_position"""
+    score = 0
+    for joueur in range(1, MAX_JOUEURS + 1):
+        if not bits.joueurs[joueur]:
+            continue
+        n1, n2, n3 = comptes_cases(bits, joueur)
+        valeur = (compter_jetons(bits, joueur) + BONUS_CASE_3 * n3 + BONUS_CASE_2 * n2 + BONUS_CASE_1 * n1
+                  + BONUS_CHAINE * chaines(bits, joueur))
+        if joueur == joueur_id:
+            score += valeur
+        else:
+            score -= valeur
+            if n3 > 1:
+                score -= MALUS_MENACE * n3
+    return score
+
+
+# -----------------------
+# COUPS
+# -----------------------
+def _cascade(bits: PlateauBits, depart: int, joueur: int) -> None:
+    """
+    Déroule l'explosion de la case depart (masque d'un bit, déjà vidée)
+    jusqu'à stabilisation, vague par vague.
+    """
+    size = bits.size
+    plein, sans_premiere, sans_derniere = masques_bords(size)
+    bit0, bit1 = bits.bit0, bits.bit1
+    touchees = depart
+    feu = depart
+    while feu:
+        # Chaque case reçoit un jeton par voisin qui explose: 3 + 4 au plus,
+        # d'où un troisième plan (bit2) le temps de la vague
+        bit2 = 0
+        for recues in ((feu << 1) & sans_premiere, (feu >> 1) & sans_derniere,
+                       (feu << size) & plein, feu >> size):
+            touchees |= recues
+            retenue = bit0 & recues
+            bit0 ^= recues
+            bit2 |= bit1 & retenue
+            bit1 ^= retenue
+        # Les cases à 4 jetons ou plus explosent à la vague suivante (en en perdant 4)
+        feu = bit2
+    bits.bit0, bits.bit1 = bit0, bit1
+
+    # Toute case touchée appartient au joueur, ou est vide si elle n'a plus de jetons
+    joueurs = bits.joueurs
+    for p in range(1, MAX_JOUEURS + 1):
+        if joueurs[p] & touchees:
+            joueurs[p] &= ~touchees
+    joueurs[joueur] |= touchees & (bit0 | bit1)
+
+
+def jouer_coup(bits: PlateauBits, x: int, y: int, joueur: int,
+               autoriser_case_vide: bool = False, arret_elimination: bool = True) -> bool:
+    """
+    Joue un coup et retourne True si valide, comme game.jouer_coup (cascade
+    complète, ou arrêtée dès l'élimination des adversaires si
+    arret_elimination, ou après game.PAS_EXPLOSION_MAX explosions).
+    """
+    b = 1 << (x * bits.size + y)
+    joueurs = bits.joueurs
+    if not joueurs[joueur] & b:
+        if not autoriser_case_vide or any(m & b for m in joueurs):
+            return False
+        joueurs[joueur] |= b
+        bits.bit0 |= b
+        return True
+
+    if not (bits.bit0 & bits.bit1 & b):
+        # Moins de 3 jetons: +1 (01 -> 10, 10 -> 11)
+        retenue = bits.bit0 & b
+        bits.bit0 ^= b
+        bits.bit1 ^= retenue
+        return True
+
+    if game.PAS_EXPLOSION_MAX is not None:
+        # Cascade bornée: les explosions traitées dépendent de leur ordre (la
+        # pile de game.explosion), le coup est joué par game
+        plateau = vers_plateau(bits)
+        jouer_coup_plateau(plateau, x, y, joueur, arret_elimination=arret_elimination)
+        resultat = depuis_plateau(plateau)
+        bits.joueurs, bits.bit0, bits.bit1 = resultat.joueurs, resultat.bit0, resultat.bit1
+        return True
+
+    adversaires = [p for p in range(1, MAX_JOUEURS + 1) if p != joueur and joueurs[p]]
+    if arret_elimination and adversaires:
+        avant = (joueurs[:], bits.bit0, bits.bit1)
+    joueurs[joueur] &= ~b
+    bits.bit0 &= ~b
+    bits.bit1 &= ~b
+    _cascade(bits, b, joueur)
+
+    # Les cases des adversaires ne font que diminuer pendant la cascade: si
+    # l'un d'eux est encore en jeu, la cascade n'a jamais été arrêtée. Sinon,
+    # l'instant de l'arrêt dépend de l'ordre des explosions: on rejoue le coup
+    # avec game.
+    if arret_elimination and adversaires and not any(joueurs[p] for p in adversaires):
+        bits.joueurs, bits.bit0, bits.bit1 = avant
+        plateau = vers_plateau(bits)
+        jouer_coup_plateau(plateau, x, y, joueur)
+        resultat = depuis_plateau(plateau)
+        bits.joueurs, bits.bit0, bits.bit1 = resultat.joueurs, resultat.bit0, resultat.bit1
+    return True
+
+
+# -----------------------
+# PERFT
+# -----------------------
+def perft(bits: PlateauBits, joueur: int, profondeur: int) -> int:
+    """
+    Nombre de feuilles de l'arbre des coups (comme bench.perft: une position
+    où la partie est finie compte comme une feuille).
+    """
+    if profondeur == 0:
+        return 1
+    total = 0
+    for x, y in coups_possibles(bits, joueur):
+        enfant = bits.copie()
+        if not jouer_coup(enfant, x, y, joueur):
+            continue
+        suivant = joueur_suivant(enfant, joueur)
+        total += 1 if suivant == joueur else perft(enfant, suivant, profondeur - 1)
+    return total
@@ -0,0 +1,135 @@
+"""
+Cache persistant des analyses, partagé entre parties et processus (SQLite).
+
+Les entrées ont la même forme que celles de la table de transposition
+(profondeur, score, borne, coup) et la même clé (minimax.cle_noeud: hash de
+Zobrist et contexte du nœud, identiques d'un processus à l'autre). La base
+est en mode WAL: plusieurs processus la lisent en même temps pendant qu'un
+autre écrit. Les écritures sont regroupées par lots, dans une transaction.
+
+Les scores dépendent de l'évaluation: après un changement de
+minimax.evaluer_position, il faut changer VERSION (ou supprimer le fichier),
+sinon les anciennes analyses seraient reprises telles quelles.
+"""
+import os
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+# Version des analyses stockées (évaluation, règles, format des clés)
+VERSION = "2"
+
+# Nombre d'entrées en attente avant une écriture groupée
+TAILLE_LOT = 512
+
+# Attente maximale (secondes) si un autre processus écrit au même moment
+ATTENTE_VERROU = 30.0
+
+# Entrée: (profondeur, score, borne, coup)
+Entree = Tuple[int, float, int, int]
+
+
+def _cle_sql(cle: int) -> int:
+    """Les entiers SQLite sont signés sur 64 bits"""
+    return cle - (1 << 64) if cle >= 1 << 63 else cle
+
+
+class CacheDisque:
+    """
+    Cache d'analyses dans un fichier SQLite.
+
+    La connexion est ouverte à la première utilisation dans chaque processus:
+    l'objet peut être copié dans un processus fils (fork) sans partager la
+    connexion du parent.
+    """
+
+    def __init__(self, chemin: str, taille_lot: int = TAILLE_LOT):
+        self.chemin = chemin
+        self.taille_lot = taille_lot
+        self._connexion = None
+        self._pid = None
+        self._en_attente: Dict[int, Entree] = {}
+        self.sondes = 0
+        self.succes = 0
+        self.ecritures = 0
+        self._connecter()  # Erreur immédiate si le fichier n'est pas utilisable
+
+    def _connecter(self):
+        if self._connexion is not None and self._pid == os.getpid():
+            return self._connexion
+        if self._pid != os.getpid():
+            # Copie d'un autre processus: ni sa connexion ni ses entrées en attente
+            self._en_attente = {}
+        connexion = sqlite3.connect(self.chemin, timeout=ATTENTE_VERROU, check_same_thread=False)
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.execute("PRAGMA synchronous=NORMAL")
+        with connexion:
+            connexion.execute("CREATE TABLE IF NOT EXISTS meta (nom TEXT PRIMARY KEY, valeur TEXT)")
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS positions ("
+                "cle INTEGER PRIMARY KEY, profondeur INTEGER, score REAL, borne INTEGER, coup INTEGER)"
+            )
+            connexion.execute("INSERT OR IGNORE INTO meta VALUES ('version', ?)", (VERSION,))
+        version = connexion.execute("SELECT valeur FROM meta WHERE nom = 'version'").fetchone()[0]
+        if version != VERSION:
+            connexion.close()
+            raise ValueError(f"{self.chemin}: analyses de la version {version}, attendu {VERSION}")
+        self._connexion = connexion
+        self._pid = os.getpid()
+        return connexion
+
+    def sonder(self, cle: int) -> Optional[Entree]:
+        """
+        Cherche une position (les entrées pas encore écrites comprises).
+
+        Returns:
+            (profondeur, score, borne, coup) ou None si absente
+        """
+        self.sondes += 1
+        entree = self._en_attente.get(cle)
+        if entree is None:
+            ligne = self._connecter().execute(
+                "SELECT profondeur, score, borne, coup FROM positions WHERE cle = ?", (_cle_sql(cle),)
+            ).fetchone()
+            if ligne is None:
+                return None
+            entree = tuple(ligne)
+        self.succes += 1
+        return entree
+
+    def stocker(self, cle: int, profondeur: int, score: float, borne: int, coup: int):
+        """Ajoute une entrée au lot en cours (écrit quand il est plein)"""
+        entree = self._en_attente.get(cle)
+        if entree is not None and entree[0] > profondeur:
+            return
+        self._en_attente[cle] = (profondeur, score, borne, coup)
+        if len(self._en_attente) >= self.taille_lot:
+            self.ecrire()
+
+    def ecrire(self):
+        """
+        Écrit le lot en cours en une transaction. Une entrée existante n'est
+        remplacée que par une analyse au moins aussi profonde.
+        """
+        if not self._en_attente:
+            return
+        connexion = self._connecter()
+        with connexion:
+            connexion.executemany(
+                "INSERT INTO positions VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(cle) DO UPDATE SET profondeur = excluded.profondeur, score = excluded.score, "
+                "borne = excluded.borne, coup = excluded.coup WHERE excluded.profondeur >= positions.profondeur",
+                [(_cle_sql(cle), *entree) for cle, entree in self._en_attente.items()]
+            )
+        self.ecritures += len(self._en_attente)
+        self._en_attente.clear()
+
+    def __len__(self):
+        self.ecrire()
+        return self._connecter().execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def fermer(self):
+        """Écrit le lot en cours et ferme la connexion"""
+        if self._connexion is not None and self._pid == os.getpid():
+            self.ecrire()
+            self._connexion.close()
+        self._connexion = None
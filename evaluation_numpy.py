@@ -0,0 +1,214 @@
+"""
+Évaluation vectorisée (NumPy) de nombreux plateaux à la fois.
+
+Un lot de plateaux est un tableau int8 de forme (N, size, size, 2):
+lot[n, x, y, 0] est le joueur de la case (x, y), lot[n, x, y, 1] son
+nombre de jetons. C'est exactement la disposition du buffer Plateau.cases,
+la conversion se fait donc sans boucle Python par case.
+"""
+import numpy as np
+
+import game
+from game import jouer_coup, plateau_depuis_octets, MAX_JOUEURS
+from minimax import BONUS_CASE_1, BONUS_CASE_2, BONUS_CASE_3, BONUS_CHAINE, MALUS_MENACE
+
+
+def plateaux_vers_lot(plateaux):
+    """
+    Empile des plateaux (même taille) dans un tableau (N, size, size, 2) int8.
+
+    Args:
+        plateaux: Séquence de Plateau
+
+    Returns:
+        Le lot de plateaux (np.ndarray)
+    """
+    size = plateaux[0].size
+    octets = b"".join(bytes(p.cases) for p in plateaux)
+    return np.frombuffer(octets, dtype=np.int8).reshape(len(plateaux), size, size, 2).copy()
+
+
+def lot_vers_plateaux(lot):
+    """Reconstruit les Plateau (hash et totaux compris) d'un lot"""
+    size = lot.shape[1]
+    return [plateau_depuis_octets(lot[n].tobytes(), size) for n in range(lot.shape[0])]
+
+
+# Valeur d'une case selon ses jetons: jetons + bonus (minimax.BONUS_CASE_*)
+_VALEURS = np.array([0, 1 + BONUS_CASE_1, 2 + BONUS_CASE_2, 3 + BONUS_CASE_3], dtype=np.int16)
+
+
+def _voisins_memes(joueurs):
+    """Nombre de voisins orthogonaux appartenant au même joueur (non vide)"""
+    memes = np.zeros(joueurs.shape, dtype=np.int16)
+    occupe = joueurs != 0
+
+    egal_x = (joueurs[:, 1:, :] == joueurs[:, :-1, :]) & occupe[:, 1:, :]
+    memes[:, 1:, :] += egal_x
+    memes[:, :-1, :] += egal_x
+
+    egal_y = (joueurs[:, :, 1:] == joueurs[:, :, :-1]) & occupe[:, :, 1:]
+    memes[:, :, 1:] += egal_y
+    memes[:, :, :-1] += egal_y
+    return memes
+
+
+def evaluer_plateaux(lot, joueur_id, adversaire_id=None):
+    """
+    Évalue un lot de plateaux, avec le même score que evaluer_plateau
+    (ou que evaluer_position si adversaire_id est None).
+
+    Prend en compte, comme la version scalaire:
+    1. La différence de jetons (score brut)
+    2. Les cellules à 3, 2 et 1 jetons (15, 5 et 2 points)
+    3. Les chaînes d'explosion potentielles (3 points par voisin du même
+       joueur d'une cellule à 3 jetons, en malus pour tous les autres joueurs)
+    4. Les menaces imminentes (10 points par cellule à 3 jetons de
+       l'adversaire s'il en a plusieurs)
+
+    Args:
+        lot: Tableau (N, size, size, 2) int8
+        joueur_id: ID du joueur
+        adversaire_id: ID de l'adversaire (None: tous les autres joueurs)
+
+    Returns:
+        Scores (np.ndarray int64 de forme (N,))
+    """
+    n = lot.shape[0]
+    joueurs = lot[..., 0]
+    jetons = lot[..., 1]
+
+    nous = joueurs == joueur_id
+    if adversaire_id is None:
+        eux = (joueurs != 0) & ~nous
+        adversaires = [j for j in range(1, MAX_JOUEURS + 1) if j != joueur_id]
+    else:
+        eux = joueurs == adversaire_id
+        adversaires = [adversaire_id]
+    signe = nous.astype(np.int16) - eux
+
+    # Différence de jetons et cellules à 3, 2 et 1 jetons
+    valeurs = _VALEURS[jetons]
+    valeurs *= signe
+
+    # Chaînes d'explosion potentielles: BONUS_CHAINE par lien, en plus pour nous, en moins pour les autres
+    critiques = jetons == 3
+    chaine = _voisins_memes(joueurs)
+    chaine *= critiques
+    chaine *= 2 * BONUS_CHAINE * nous - BONUS_CHAINE
+    valeurs += chaine
+
+    scores = valeurs.reshape(n, -1).sum(axis=1, dtype=np.int64)
+
+    # Menaces imminentes de chaque adversaire
+    for adversaire in adversaires:
+        pretes_adversaire = (critiques & (joueurs == adversaire)).reshape(n, -1).sum(axis=1)
+        scores -= np.where(pretes_adversaire > 1, MALUS_MENACE * pretes_adversaire, 0)
+    return scores
+
+
+def developper_enfants(plateau, coups, joueur, autoriser_case_vide=False):
+    """
+    Joue chaque coup sur une copie du plateau, toutes les copies à la fois.
+
+    Les explosions sont résolues par vagues synchrones sur tout le lot: à
+    chaque vague, les cases à 4 jetons ou plus perdent 4 jetons et en
+    donnent un à chaque voisin, qui passe au joueur. Ce modèle est celui
+    du tas de sable abélien: l'état final ne dépend pas de l'ordre des
+    explosions et il est identique à celui de game.explosion (qui explose
+    case par case avec une pile).
+
+    Exceptions: game.explosion arrête la cascade dès que le dernier
+    adversaire est éliminé, à un point qui dépend de l'ordre. Les rares
+    enfants qui éliminent tous les adversaires sont donc rejoués avec
+    jouer_coup. Il en va de même pour tous les enfants qui explosent quand
+    game.PAS_EXPLOSION_MAX borne la cascade (explosions traitées dans
+    l'ordre de la pile de game.explosion).
+
+    Args:
+        plateau: Plateau de départ (non modifié)
+        coups: Liste de coups (x, y)
+        joueur: Joueur qui joue
+        autoriser_case_vide: True si on peut jouer sur une case vide
+
+    Returns:
+        Tuple (lot, valides): le lot (M, size, size, 2) des plateaux enfants
+        et la liste des indices dans coups des M coups valides
+    """
+    size = plateau.size
+    cases = plateau.cases
+
+    valides = []
+    xs = []
+    ys = []
+    for i, (x, y) in enumerate(coups):
+        proprietaire = cases[2 * (x * size + y)]
+        if proprietaire == joueur or (proprietaire == 0 and autoriser_case_vide):
+            valides.append(i)
+            xs.append(x)
+            ys.append(y)
+    if not valides:
+        return np.empty((0, size, size, 2), dtype=np.int8), valides
+
+    n = len(valides)
+    base = np.frombuffer(cases, dtype=np.int8).reshape(size, size, 2)
+    joueurs = np.repeat(base[None, :, :, 0], n, axis=0)
+    jetons = np.repeat(base[None, :, :, 1], n, axis=0)
+    lignes = np.arange(n)
+    joueurs[lignes, xs, ys] = joueur
+    jetons[lignes, xs, ys] += 1
+
+    # Vagues d'explosions, limitées aux plateaux encore instables
+    actifs = np.flatnonzero(jetons[lignes, xs, ys] >= 4)
+    rejoues = set()
+    if game.PAS_EXPLOSION_MAX is not None:
+        rejoues.update(actifs.tolist())
+        actifs = actifs[:0]
+    while actifs.size:
+        j = jetons[actifs]
+        o = joueurs[actifs]
+        explose = j >= 4
+        j -= 4 * explose
+        recus = np.zeros(j.shape, dtype=np.int8)
+        recus[:, 1:, :] += explose[:, :-1, :]
+        recus[:, :-1, :] += explose[:, 1:, :]
+        recus[:, :, 1:] += explose[:, :, :-1]
+        recus[:, :, :-1] += explose[:, :, 1:]
+        j += recus
+        o[recus > 0] = joueur
+        o[j == 0] = 0
+        jetons[actifs] = j
+        joueurs[actifs] = o
+        actifs = actifs[(j >= 4).any(axis=(1, 2))]
+
+    lot = np.stack([joueurs, jetons], axis=-1)
+    adversaires = [p for p in range(1, len(plateau.jetons_joueur)) if p != joueur and plateau.jetons_joueur[p]]
+    if adversaires:
+        rejoues.update(np.flatnonzero(~np.isin(joueurs, adversaires).any(axis=(1, 2))).tolist())
+    for n_enfant in sorted(rejoues):
+        enfant = plateau.copie()
+        jouer_coup(enfant, xs[n_enfant], ys[n_enfant], joueur, autoriser_case_vide=True)
+        lot[n_enfant] = np.frombuffer(enfant.cases, dtype=np.int8).reshape(size, size, 2)
+    return lot, valides
+
+
+def scores_frontiere(plateau, coups, joueur, joueur_id, autoriser_case_vide=False):
+    """
+    Score de chaque coup d'un nœud de profondeur 1, en un seul lot.
+
+    Args:
+        plateau: Plateau du nœud (non modifié)
+        coups: Coups à évaluer (x, y)
+        joueur: Joueur qui joue ces coups
+        joueur_id: Point de vue de l'évaluation (face à tous les adversaires)
+
+    Returns:
+        Liste alignée sur coups: le score du plateau enfant, ou None si le
+        coup est invalide
+    """
+    lot, valides = developper_enfants(plateau, coups, joueur, autoriser_case_vide)
+    scores = [None] * len(coups)
+    if valides:
+        for i, score in zip(valides, evaluer_plateaux(lot, joueur_id).tolist()):
+            scores[i] = score
+    return scores
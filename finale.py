@@ -0,0 +1,222 @@
+"""
+Résolution exacte des fins de partie (victoire / défaite seulement).
+
+Quand un joueur n'a presque plus de cases, la plupart des coups décident de
+la partie par élimination. minimax_alpha_beta s'arrête à sa profondeur et
+rend un score heuristique; ici, seules comptent l'élimination et sa
+distance. Une position vaut VICTOIRE - d (joueur_id gagne en d plis),
+-(VICTOIRE - d) (il est éliminé en d plis) ou 0 (rien de prouvé à cet
+horizon). L'approfondissement itératif trouve donc la victoire la plus
+courte, et en cas de défaite le coup qui résiste le plus longtemps.
+
+Comme minimax_alpha_beta, la recherche est paranoïaque au-delà de deux
+joueurs: « victoire » signifie que joueur_id reste seul quoi que fassent
+les autres.
+"""
+import time
+from random import Random
+
+from game import jouer_coup, annuler_coup, joueur_suivant, cases_joueur, MAX_JOUEURS
+
+# Valeur d'une victoire immédiate (moins la distance en plis)
+VICTOIRE = 10_000
+# Au-delà de ce seuil (en valeur absolue), un score est une issue prouvée
+SEUIL_ISSUE = VICTOIRE - 1000
+
+# Déclenchement: un joueur en jeu n'a plus que SEUIL_CASES_FINALE cases ou moins
+# (donc autant de coups), hors ouverture (au moins SEUIL_OCCUPATION_FINALE
+# cases occupées: au début, chacun n'a qu'une ou deux cases). Sur des fins de
+# parties entre bots, la moitié environ de ces positions sont résolues dans
+# le budget; au-delà de 2 cases, la résolution échoue trop souvent pour son coût.
+SEUIL_CASES_FINALE = 2
+SEUIL_OCCUPATION_FINALE = 10
+
+# Budget par défaut de la résolution
+PROFONDEUR_FINALE = 24
+NOEUDS_FINALE = 20_000
+
+# Table propre au solveur: clé -> (profondeur, score, borne, case)
+TAILLE_TABLE_FINALE = 1 << 18
+EXACTE, INFERIEURE, SUPERIEURE = 0, 1, 2
+table_finale = {}
+
+_rng_cles = Random(0xF1_4A1E)
+_cles_contexte = [_rng_cles.getrandbits(64) for _ in range((MAX_JOUEURS + 1) ** 2)]
+
+
+class ResolutionInterrompue(Exception):
+    """Budget de la résolution épuisé"""
+
+
+def en_finale(plateau):
+    """Vrai si la position est assez réduite pour tenter une résolution exacte"""
+    jetons = plateau.jetons_joueur
+    comptes = plateau.comptes
+    occupees = 0
+    plus_petit = None
+    for joueur in range(1, len(jetons)):
+        if jetons[joueur]:
+            k = 4 * joueur
+            nb_cases = comptes[k + 1] + comptes[k + 2] + comptes[k + 3]
+            occupees += nb_cases
+            if plus_petit is None or nb_cases < plus_petit:
+                plus_petit = nb_cases
+    return plus_petit is not None and plus_petit <= SEUIL_CASES_FINALE and occupees >= SEUIL_OCCUPATION_FINALE
+
+
+def _vers_table(score, ply):
+    """Les issues sont stockées en distance depuis le nœud, pas depuis la racine"""
+    if score > SEUIL_ISSUE:
+        return score + ply
+    if score < -SEUIL_ISSUE:
+        return score - ply
+    return score
+
+
+def _depuis_table(score, ply):
+    if score > SEUIL_ISSUE:
+        return score - ply
+    if score < -SEUIL_ISSUE:
+        return score + ply
+    return score
+
+
+class _Budget:
+    __slots__ = ("noeuds", "noeuds_max", "echeance", "arret")
+
+    def __init__(self, noeuds_max, echeance, arret):
+        self.noeuds = 0
+        self.noeuds_max = noeuds_max
+        self.echeance = echeance
+        self.arret = arret
+
+    def compter(self):
+        self.noeuds += 1
+        if self.noeuds_max is not None and self.noeuds > self.noeuds_max:
+            raise ResolutionInterrompue()
+        if self.noeuds & 0xFF == 0:
+            if self.echeance is not None and time.perf_counter() > self.echeance:
+                raise ResolutionInterrompue()
+            if self.arret is not None and self.arret.is_set():
+                raise ResolutionInterrompue()
+
+
+def _resoudre(plateau, joueur_id, trait, profondeur, alpha, beta, ply, budget):
+    """
+    Alpha-bêta victoire/défaite depuis une position où trait doit jouer.
+
+    Returns:
+        Tuple (score, case): score du point de vue de joueur_id (voir le
+        module), case du meilleur coup (indice plat, -1 si aucun)
+    """
+    if profondeur == 0:
+        return 0, -1
+
+    cle = plateau.zobrist ^ _cles_contexte[(MAX_JOUEURS + 1) * joueur_id + trait]
+    entree = table_finale.get(cle)
+    case_table = -1
+    if entree is not None:
+        profondeur_table, score_table, borne, case_table = entree
+        score_table = _depuis_table(score_table, ply)
+        # Une issue prouvée reste vraie à toute profondeur
+        if profondeur_table >= profondeur or abs(score_table) > SEUIL_ISSUE:
+            if (borne == EXACTE
+                    or (borne == INFERIEURE and score_table >= beta)
+                    or (borne == SUPERIEURE and score_table <= alpha)):
+                return score_table, case_table
+    alpha_initial, beta_initial = alpha, beta
+
+    # Coups: celui de la table, puis les explosions (qui décident des fins de partie)
+    size = plateau.size
+    cases = plateau.cases
+    coups = cases_joueur(plateau, trait)
+    coups.sort(key=lambda i: (i != case_table, cases[2 * i + 1] != 3))
+
+    est_maximisant = trait == joueur_id
+    meilleur = -VICTOIRE - 1 if est_maximisant else VICTOIRE + 1
+    meilleure_case = -1
+    jetons = plateau.jetons_joueur
+    journal = []
+    for i in coups:
+        jouer_coup(plateau, i // size, i % size, trait, journal=journal)
+        budget.compter()
+        if not jetons[joueur_id]:
+            score = -(VICTOIRE - ply - 1)
+        else:
+            suivant = joueur_suivant(plateau, trait)
+            if suivant == trait:
+                # trait a éliminé tous les autres (joueur_id compris s'il n'est pas trait)
+                score = VICTOIRE - ply - 1
+            else:
+                score, _ = _resoudre(plateau, joueur_id, suivant, profondeur - 1, alpha, beta, ply + 1, budget)
+        annuler_coup(plateau, journal)
+
+        if est_maximisant:
+            if score > meilleur:
+                meilleur, meilleure_case = score, i
+            alpha = max(alpha, score)
+        else:
+            if score < meilleur:
+                meilleur, meilleure_case = score, i
+            beta = min(beta, score)
+        if alpha >= beta:
+            break
+
+    if meilleur <= alpha_initial:
+        borne = SUPERIEURE
+    elif meilleur >= beta_initial:
+        borne = INFERIEURE
+    else:
+        borne = EXACTE
+    if len(table_finale) >= TAILLE_TABLE_FINALE:
+        table_finale.clear()
+    table_finale[cle] = (profondeur, _vers_table(meilleur, ply), borne, meilleure_case)
+    return meilleur, meilleure_case
+
+
+def resoudre(plateau, joueur_id, profondeur_max=PROFONDEUR_FINALE, noeuds_max=NOEUDS_FINALE,
+             echeance=None, arret=None):
+    """
+    Cherche une issue forcée pour joueur_id, au trait, par approfondissement.
+
+    Args:
+        plateau: Position (non modifiée)
+        joueur_id: Joueur au trait
+        profondeur_max: Horizon maximal en plis
+        noeuds_max: Budget en nœuds (None = pas de limite)
+        echeance: Instant (time.perf_counter) où abandonner
+        arret: threading.Event optionnel qui abandonne la résolution
+
+    Returns:
+        Tuple (issue, coup, distance, noeuds): issue 1 (victoire forcée en
+        distance plis par coup), -1 (défaite forcée; coup est celui qui
+        résiste le plus longtemps) ou 0 (rien de prouvé, coup None)
+    """
+    budget = _Budget(noeuds_max, echeance, arret)
+    # Une interruption peut laisser la copie au milieu d'un coup
+    plateau = plateau.copie()
+    size = plateau.size
+    try:
+        for profondeur in range(1, profondeur_max + 1):
+            # Fenêtres nulles: « gagne-t-on en profondeur plis ? », puis « perd-on
+            # quoi qu'on joue ? ». Elles coupent bien plus qu'une fenêtre complète,
+            # où la plupart des nœuds valent 0 (rien de prouvé).
+            score, case = _resoudre(plateau, joueur_id, joueur_id, profondeur, 0, 1, 0, budget)
+            if case < 0:
+                break
+            if score > 0:
+                # Aucune victoire à la profondeur précédente: celle-ci est la plus courte
+                return 1, divmod(case, size), profondeur, budget.noeuds
+            score, case = _resoudre(plateau, joueur_id, joueur_id, profondeur, -1, 0, 0, budget)
+            if score < 0:
+                # Tous les coups perdent: la valeur exacte désigne le plus résistant
+                score, case = _resoudre(plateau, joueur_id, joueur_id, profondeur,
+                                        -VICTOIRE - 1, VICTOIRE + 1, 0, budget)
+                return -1, divmod(case, size), VICTOIRE + score, budget.noeuds
+    except ResolutionInterrompue:
+        pass
+    return 0, None, None, budget.noeuds
+
+
+def vider_table():
+    table_finale.clear()
@@ -1,119 +1,557 @@
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
+import random
+from typing import Dict, List, Tuple, Iterator, Optional
 
 # -----------------------
 # CONFIGURATION
 # -----------------------
 BOARD_SIZE = 10
 INITIAL_JETON = 3
+MAX_JOUEURS = 4
+MASSE_CRITIQUE = 4  # Nombre de jetons qui fait exploser une case
+PAS_EXPLOSION_MAX = None  # Budget d'explosions par coup (None = cascade complète)
+
+# Valeur par défaut de pas_max: PAS_EXPLOSION_MAX lu au moment du coup (et
+# non à la définition de la fonction), pour qu'il puisse être changé en cours de route
+_DEFAUT = object()
+
+# -----------------------
+# TABLES DE VOISINAGE
+# -----------------------
+# Calculées une fois par taille de plateau et partagées par tous les plateaux
+_tables_voisins: Dict[int, Tuple[Tuple[int, ...], ...]] = {}
+_tables_masses: Dict[int, Tuple[int, ...]] = {}
+
+def table_voisins(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """table_voisins(size)[i] = indices plats (x * size + y) des voisins orthogonaux de la case i"""
+    table = _tables_voisins.get(size)
+    if table is None:
+        table = tuple(
+            tuple(
+                nx * size + ny
+                for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))
+                if 0 <= nx < size and 0 <= ny < size
+            )
+            for x in range(size)
+            for y in range(size)
+        )
+        _tables_voisins[size] = table
+    return table
+
+def table_masses_critiques(size: int) -> Tuple[int, ...]:
+    """table_masses_critiques(size)[i] = nombre de jetons qui fait exploser la case i"""
+    table = _tables_masses.get(size)
+    if table is None:
+        table = (MASSE_CRITIQUE,) * (size * size)
+        _tables_masses[size] = table
+    return table
+
+# -----------------------
+# HACHAGE DE ZOBRIST
+# -----------------------
+# Graine fixe : les clés doivent être identiques d'un processus à l'autre
+GRAINE_ZOBRIST = 0x5EED_C0DE
+_tables_zobrist: Dict[int, List[int]] = {}
+
+def table_zobrist(size: int) -> List[int]:
+    """
+    Retourne la table de Zobrist d'un plateau de taille size.
+
+    La valeur de l'état (joueur, jeton) de la case k = 2*i est à l'indice
+    10*k + 4*joueur + jeton. La case vide vaut 0 : le plateau vide a un
+    hash nul.
+    """
+    table = _tables_zobrist.get(size)
+    if table is None:
+        rng = random.Random(GRAINE_ZOBRIST + size)
+        table = [rng.getrandbits(64) for _ in range(10 * 2 * size * size)]
+        for k in range(0, 2 * size * size, 2):
+            table[10 * k] = 0
+        _tables_zobrist[size] = table
+    return table
+
+# -----------------------
+# SYMÉTRIES DU CARRÉ
+# -----------------------
+# Les règles ne changent pas par rotation ou symétrie du plateau. La
+# symétrie s envoie la case (x, y) sur: identité, rotations d'un, deux et
+# trois quarts de tour, symétries d'axe x, d'axe y et des deux diagonales.
+NB_SYMETRIES = 8
+INVERSES_SYMETRIES = (0, 3, 2, 1, 4, 5, 6, 7)
+_tables_symetries: Dict[int, Tuple[Tuple[int, ...], ...]] = {}
+_tables_zobrist_symetries: Dict[int, List[int]] = {}
+MASQUE_ZOBRIST = (1 << 64) - 1
+
+def table_symetries(size: int) -> Tuple[Tuple[int, ...], ...]:
+    """table_symetries(size)[s][i] = indice plat de l'image de la case i par la symétrie s"""
+    table = _tables_symetries.get(size)
+    if table is None:
+        m = size - 1
+        images = (
+            lambda x, y: (x, y), lambda x, y: (y, m - x), lambda x, y: (m - x, m - y),
+            lambda x, y: (m - y, x), lambda x, y: (m - x, y), lambda x, y: (x, m - y),
+            lambda x, y: (y, x), lambda x, y: (m - y, m - x),
+        )
+        table = tuple(
+            tuple(image(x, y)[0] * size + image(x, y)[1] for x in range(size) for y in range(size))
+            for image in images
+        )
+        _tables_symetries[size] = table
+    return table
+
+def table_zobrist_symetries(size: int) -> List[int]:
+    """
+    Retourne la table des hash des 8 images d'un plateau de taille size.
+
+    Même indice que table_zobrist; chaque valeur concatène en 8 tranches de
+    64 bits (tranche s = symétrie s) la valeur de Zobrist de l'image de la
+    case. Un seul XOR met ainsi à jour les 8 hash à la fois.
+    """
+    table = _tables_zobrist_symetries.get(size)
+    if table is None:
+        zobrist = table_zobrist(size)
+        symetries = table_symetries(size)
+        table = [0] * len(zobrist)
+        for i in range(size * size):
+            for etat in range(20):
+                table[20 * i + etat] = sum(
+                    zobrist[20 * symetries[s][i] + etat] << (64 * s) for s in range(NB_SYMETRIES)
+                )
+        _tables_zobrist_symetries[size] = table
+    return table
+
+# -----------------------
+# PLATEAU COMPACT
+# -----------------------
+class Plateau:
+    """
+    Plateau stocké dans un unique bytearray.
+
+    La case (x, y) occupe les octets 2*i (joueur) et 2*i + 1 (jeton)
+    avec i = x * size + y. Une copie du plateau est donc une seule copie
+    de buffer, sans aucun objet Python par case.
+
+    Les autres attributs sont tenus à jour à chaque modification de case:
+    - zobrist: hash 64 bits de la position
+    - zobrist_symetries: hash des 8 images du plateau par les symétries
+      du carré, en tranches de 64 bits (la tranche 0 est zobrist); None
+      tant que personne ne l'a demandé (voir calculer_zobrist_symetries):
+      perft, MCTS et finale ne paient pas sa mise à jour
+    - jetons_joueur[j]: total des jetons du joueur j
+    - comptes[4*j + t]: nombre de cases du joueur j portant t jetons (t = 1..3)
+    - chaines[j]: pour chaque case du joueur j à 3 jetons, nombre de ses
+      voisins appartenant aussi à j (potentiel d'explosion en chaîne)
+    - masques[j]: cases du joueur j, un bit par case (bit i); masques[0]
+      contient les cases vides
+
+    La taille est propre à chaque plateau: voisins et masses pointent vers
+    les tables partagées de cette taille (table_voisins,
+    table_masses_critiques).
+    """
+    __slots__ = ("size", "cases", "voisins", "masses", "zobrist", "zobrist_symetries",
+                 "jetons_joueur", "comptes", "chaines", "masques")
+
+    def __init__(self, size: int = BOARD_SIZE):
+        self.size = size
+        self.cases = bytearray(2 * size * size)
+        self.voisins = table_voisins(size)
+        self.masses = table_masses_critiques(size)
+        self.zobrist = 0
+        self.zobrist_symetries = None
+        self.jetons_joueur = [0] * (MAX_JOUEURS + 1)
+        self.comptes = [0] * (4 * (MAX_JOUEURS + 1))
+        self.chaines = [0] * (MAX_JOUEURS + 1)
+        self.masques = [(1 << (size * size)) - 1] + [0] * MAX_JOUEURS
+
+    def copie(self) -> "Plateau":
+        """Retourne une copie indépendante du plateau"""
+        nouveau = Plateau.__new__(Plateau)
+        nouveau.size = self.size
+        nouveau.cases = self.cases[:]
+        nouveau.voisins = self.voisins
+        nouveau.masses = self.masses
+        nouveau.zobrist = self.zobrist
+        nouveau.zobrist_symetries = self.zobrist_symetries
+        nouveau.jetons_joueur = self.jetons_joueur[:]
+        nouveau.comptes = self.comptes[:]
+        nouveau.chaines = self.chaines[:]
+        nouveau.masques = self.masques[:]
+        return nouveau
+
+    __copy__ = copie
+
+    def __deepcopy__(self, memo) -> "Plateau":
+        return self.copie()
+
+    # --- Sérialisation (pickle): les tables partagées ne sont pas envoyées ---
+    def __getstate__(self):
+        return (self.size, bytes(self.cases), self.zobrist, self.zobrist_symetries,
+                self.jetons_joueur, self.comptes, self.chaines, self.masques)
+
+    def __setstate__(self, etat):
+        (size, cases, self.zobrist, self.zobrist_symetries,
+         self.jetons_joueur, self.comptes, self.chaines, self.masques) = etat
+        self.size = size
+        self.cases = bytearray(cases)
+        self.voisins = table_voisins(size)
+        self.masses = table_masses_critiques(size)
+
+    # --- Vue de compatibilité : plateau[x][y].joueur / .jeton ---
+    def __getitem__(self, x: int) -> "Ligne":
+        if not 0 <= x < self.size:
+            raise IndexError(x)
+        return Ligne(self, x)
+
+    def __iter__(self) -> Iterator["Ligne"]:
+        for x in range(self.size):
+            yield Ligne(self, x)
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class Ligne:
+    """Vue légère sur la colonne x du plateau (plateau[x])"""
+    __slots__ = ("plateau", "x")
+
+    def __init__(self, plateau: Plateau, x: int):
+        self.plateau = plateau
+        self.x = x
+
+    def __getitem__(self, y: int) -> "Cell":
+        size = self.plateau.size
+        if not 0 <= y < size:
+            raise IndexError(y)
+        return Cell(self.plateau, self.x * size + y)
+
+    def __iter__(self) -> Iterator["Cell"]:
+        base = self.x * self.plateau.size
+        for y in range(self.plateau.size):
+            yield Cell(self.plateau, base + y)
+
+    def __len__(self) -> int:
+        return self.plateau.size
+
 
-@dataclass
 class Cell:
-    joueur: int = 0
-    jeton: int = 0
+    """Vue en lecture seule sur une case du plateau (plateau[x][y])"""
+    __slots__ = ("plateau", "index")
+
+    def __init__(self, plateau: Plateau, index: int):
+        self.plateau = plateau
+        self.index = index
+
+    @property
+    def joueur(self) -> int:
+        return self.plateau.cases[2 * self.index]
 
-Plateau = List[List[Cell]]
+    @property
+    def jeton(self) -> int:
+        return self.plateau.cases[2 * self.index + 1]
+
+    def __repr__(self) -> str:
+        return f"Cell(joueur={self.joueur}, jeton={self.jeton})"
 
 # -----------------------
 # CRÉATION DU PLATEAU
 # -----------------------
 def create_board(size: int = BOARD_SIZE) -> Plateau:
-    return [[Cell() for _ in range(size)] for _ in range(size)]
+    return Plateau(size)
 
 # -----------------------
 # OUTILS INTERNES
 # -----------------------
-def voisins(x: int, y: int) -> List[Tuple[int, int]]:
+def voisins(x: int, y: int, size: int = BOARD_SIZE) -> List[Tuple[int, int]]:
     """Retourne les voisins orthogonaux d'une case"""
     return [
         (nx, ny)
         for nx, ny in [(x-1, y), (x+1, y), (x, y-1), (x, y+1)]
-        if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE
+        if 0 <= nx < size and 0 <= ny < size
     ]
 
-def coups_possibles(plateau: Plateau, joueur: int) -> List[Tuple[int, int]]:
-    """Retourne la liste des coups possibles pour un joueur"""
+def cases_joueur(plateau: Plateau, joueur: int) -> List[int]:
+    """Indices plats des cases du joueur (des cases vides si joueur = 0), par ordre croissant"""
+    m = plateau.masques[joueur]
+    indices = []
+    while m:
+        b = m & -m
+        indices.append(b.bit_length() - 1)
+        m ^= b
+    return indices
+
+def coups_possibles(
+    plateau: Plateau,
+    joueur: int,
+    autoriser_case_vide: bool = False
+) -> List[Tuple[int, int]]:
+    """
+    Retourne la liste des coups possibles pour un joueur: ses cases, plus
+    les cases vides si autoriser_case_vide (premier coup sans placement,
+    comme dans jouer_coup).
+    """
+    size = plateau.size
+    m = plateau.masques[joueur]
+    if autoriser_case_vide:
+        m |= plateau.masques[0]
     coups = []
-    for x in range(BOARD_SIZE):
-        for y in range(BOARD_SIZE):
-            if plateau[x][y].joueur in (0, joueur):
-                coups.append((x, y))
+    while m:
+        b = m & -m
+        coups.append(divmod(b.bit_length() - 1, size))
+        m ^= b
     return coups
 
 # -----------------------
 # MÉCANIQUES DU JEU
 # -----------------------
-def explosion(plateau: Plateau, x: int, y: int, joueur: int) -> List[Tuple[int, int]]:
-    """Gère l'explosion en chaîne et retourne les cases affectées pour l'animation"""
-    cases_affectees = []
-    pile = [(x, y)]
-    
+Journal = List[Tuple[int, int, int]]
+
+def _modifier_case(
+    plateau: Plateau,
+    k: int,
+    joueur: int,
+    jeton: int,
+    journal: Optional[Journal] = None
+) -> None:
+    """Écrit une case (k = 2*i) en notant son ancien état dans le journal"""
+    cases = plateau.cases
+    ancien_joueur = cases[k]
+    ancien_jeton = cases[k + 1]
+    if journal is not None:
+        journal.append((k, ancien_joueur, ancien_jeton))
+    size = plateau.size
+    table = _tables_zobrist.get(size) or table_zobrist(size)
+    ancien = 10 * k + 4 * ancien_joueur + ancien_jeton
+    nouveau = 10 * k + 4 * joueur + jeton
+    plateau.zobrist ^= table[ancien] ^ table[nouveau]
+    if plateau.zobrist_symetries is not None:
+        table = _tables_zobrist_symetries.get(size) or table_zobrist_symetries(size)
+        plateau.zobrist_symetries ^= table[ancien] ^ table[nouveau]
+
+    # Totaux de jetons et de cases par nombre de jetons
+    comptes = plateau.comptes
+    if ancien_joueur:
+        plateau.jetons_joueur[ancien_joueur] -= ancien_jeton
+        comptes[4 * ancien_joueur + ancien_jeton] -= 1
+    if joueur:
+        plateau.jetons_joueur[joueur] += jeton
+        comptes[4 * joueur + jeton] += 1
+    if ancien_joueur != joueur:
+        bit = 1 << (k >> 1)
+        masques = plateau.masques
+        masques[ancien_joueur] ^= bit
+        masques[joueur] ^= bit
+
+    # Potentiel de chaîne: seuls comptent les liens entre cases voisines du
+    # même joueur dont l'une porte 3 jetons. Inchangé si le propriétaire et
+    # le statut « 3 jetons » de la case ne changent pas.
+    if ancien_joueur == joueur and (ancien_jeton == 3) == (jeton == 3):
+        cases[k] = joueur
+        cases[k + 1] = jeton
+        return
+    chaines = plateau.chaines
+    voisins_i = plateau.voisins[k >> 1]
+    if ancien_joueur:
+        for iv in voisins_i:
+            kv = iv << 1
+            if cases[kv] == ancien_joueur:
+                if ancien_jeton == 3:
+                    chaines[ancien_joueur] -= 1
+                if cases[kv + 1] == 3:
+                    chaines[ancien_joueur] -= 1
+    cases[k] = joueur
+    cases[k + 1] = jeton
+    if joueur:
+        for iv in voisins_i:
+            kv = iv << 1
+            if cases[kv] == joueur:
+                if jeton == 3:
+                    chaines[joueur] += 1
+                if cases[kv + 1] == 3:
+                    chaines[joueur] += 1
+
+def explosion(
+    plateau: Plateau,
+    x: int,
+    y: int,
+    joueur: int,
+    journal: Optional[Journal] = None,
+    cases_affectees: Optional[List[Tuple[int, int]]] = None,
+    pas_max: Optional[int] = _DEFAUT,
+    arret_elimination: bool = True
+) -> int:
+    """
+    Gère l'explosion en chaîne de la case (x, y), déjà vidée.
+
+    La cascade s'arrête dès qu'il ne reste plus aucun adversaire sur le
+    plateau et que le joueur y possède au moins une case (le coup a gagné
+    la partie, la suite ne changerait pas l'issue), ou après pas_max
+    explosions.
+
+    Args:
+        journal: Si fourni, reçoit l'ancien état des cases modifiées
+        cases_affectees: Si fourni, reçoit les cases touchées (pour l'animation)
+        pas_max: Nombre maximal d'explosions traitées (None = pas de limite,
+                 par défaut PAS_EXPLOSION_MAX)
+        arret_elimination: False pour toujours dérouler la cascade complète
+
+    Returns:
+        Le nombre d'explosions traitées
+    """
+    if pas_max is _DEFAUT:
+        pas_max = PAS_EXPLOSION_MAX
+    cases = plateau.cases
+    size = plateau.size
+    table = plateau.voisins
+    masses = plateau.masses
+    jetons_joueur = plateau.jetons_joueur
+    adversaires = [
+        p for p in range(1, MAX_JOUEURS + 1)
+        if p != joueur and jetons_joueur[p]
+    ] if arret_elimination else []
+    elimines = False
+    pile = [x * size + y]
+    explosions = 0
+
     while pile:
-        cx, cy = pile.pop()
-        for nx, ny in voisins(cx, cy):
-            cell = plateau[nx][ny]
-            cell.joueur = joueur
-            cell.jeton += 1
-            cases_affectees.append((nx, ny))
-            
-            if cell.jeton >= 4:
-                cell.jeton = 0
-                cell.joueur = 0
-                pile.append((nx, ny))
-    
-    return cases_affectees
+        if pas_max is not None and explosions >= pas_max:
+            break
+        explosions += 1
+        for i in table[pile.pop()]:
+            k = i << 1
+            proprietaire = cases[k]
+            if cases_affectees is not None:
+                cases_affectees.append(divmod(i, size))
+
+            if cases[k + 1] + 1 >= masses[i]:
+                _modifier_case(plateau, k, 0, 0, journal)
+                pile.append(i)
+            else:
+                _modifier_case(plateau, k, joueur, cases[k + 1] + 1, journal)
+
+            # Dernière case d'un adversaire prise: tous éliminés ?
+            if (adversaires and not elimines and proprietaire and proprietaire != joueur
+                    and not jetons_joueur[proprietaire]):
+                elimines = not any(jetons_joueur[p] for p in adversaires)
+            # On s'arrête dès que le joueur possède à nouveau une case
+            if elimines and jetons_joueur[joueur]:
+                return explosions
+
+    return explosions
 
 def jouer_coup(
     plateau: Plateau,
     x: int,
     y: int,
     joueur: int,
-    autoriser_case_vide: bool = False
+    autoriser_case_vide: bool = False,
+    journal: Optional[Journal] = None,
+    cases_affectees: Optional[List[Tuple[int, int]]] = None,
+    pas_max: Optional[int] = _DEFAUT,
+    arret_elimination: bool = True
 ) -> bool:
-    """Joue un coup et retourne True si valide"""
-    cell = plateau[x][y]
+    """
+    Joue un coup et retourne True si valide.
+
+    Si un journal (liste) est fourni, l'ancien état de chaque case modifiée
+    y est ajouté pour permettre annuler_coup. cases_affectees, pas_max et
+    arret_elimination sont transmis à explosion.
+    """
+    cases = plateau.cases
+    i = x * plateau.size + y
+    k = i << 1
+    proprietaire = cases[k]
 
-    if cell.joueur not in (0, joueur):
+    if proprietaire not in (0, joueur):
         return False
 
-    if cell.joueur == 0 and not autoriser_case_vide:
+    if proprietaire == 0 and not autoriser_case_vide:
         return False
 
-    if cell.joueur == 0:
-        cell.joueur = joueur
-        cell.jeton = 1
+    if proprietaire == 0:
+        _modifier_case(plateau, k, joueur, 1, journal)
         return True
 
-    cell.jeton += 1
-    if cell.jeton >= 4:
-        cell.jeton = 0
-        cell.joueur = 0
-        explosion(plateau, x, y, joueur)
+    if cases[k + 1] + 1 >= plateau.masses[i]:
+        _modifier_case(plateau, k, 0, 0, journal)
+        explosion(plateau, x, y, joueur, journal, cases_affectees, pas_max, arret_elimination)
+    else:
+        _modifier_case(plateau, k, joueur, cases[k + 1] + 1, journal)
 
     return True
 
+def annuler_coup(plateau: Plateau, journal: Journal) -> None:
+    """Restaure exactement le plateau d'avant le coup noté dans le journal"""
+    for k, joueur, jeton in reversed(journal):
+        _modifier_case(plateau, k, joueur, jeton)
+    journal.clear()
+
 def placer_jeton_initial(plateau: Plateau, x: int, y: int, joueur: int) -> bool:
     """Place le jeton initial d'un joueur"""
-    cell = plateau[x][y]
-    if cell.joueur != 0:
+    cases = plateau.cases
+    k = 2 * (x * plateau.size + y)
+    if cases[k] != 0:
         return False
-    cell.joueur = joueur
-    cell.jeton = INITIAL_JETON
+    _modifier_case(plateau, k, joueur, INITIAL_JETON)
     return True
 
+def plateau_depuis_octets(cases: bytes, size: int = BOARD_SIZE) -> Plateau:
+    """
+    Reconstruit un plateau à partir de ses octets (joueur, jeton) par case.
+
+    Le hash et les totaux sont recalculés: c'est le chemin à suivre pour un
+    plateau venant d'un fichier, d'un tableau NumPy ou d'un autre processus.
+    """
+    plateau = Plateau(size)
+    for k in range(0, 2 * size * size, 2):
+        if cases[k]:
+            _modifier_case(plateau, k, cases[k], cases[k + 1])
+    return plateau
+
+def calculer_zobrist(plateau: Plateau) -> int:
+    """Recalcule entièrement le hash de Zobrist (contrôle de plateau.zobrist)"""
+    table = table_zobrist(plateau.size)
+    cases = plateau.cases
+    h = 0
+    for k in range(0, len(cases), 2):
+        h ^= table[10 * k + 4 * cases[k] + cases[k + 1]]
+    return h
+
+def calculer_zobrist_symetries(plateau: Plateau) -> int:
+    """
+    Calcule le hash des 8 images du plateau (voir table_zobrist_symetries)
+    et le tient à jour à partir de là, pour ce plateau et ses copies.
+    """
+    size = plateau.size
+    table = table_zobrist_symetries(size)
+    cases = plateau.cases
+    h = 0
+    m = plateau.masques[0] ^ ((1 << (size * size)) - 1)
+    while m:
+        b = m & -m
+        k = 2 * (b.bit_length() - 1)
+        h ^= table[10 * k + 4 * cases[k] + cases[k + 1]]
+        m ^= b
+    plateau.zobrist_symetries = h
+    return h
+
 def joueur_a_perdu(plateau: Plateau, joueur: int) -> bool:
-    """Vérifie si un joueur n'a plus de jetons"""
-    return all(
-        cell.joueur != joueur
-        for row in plateau
-        for cell in row
-    )
+    """Vérifie si un joueur n'a plus de cases"""
+    return not plateau.masques[joueur]
+
+def joueur_suivant(plateau: Plateau, joueur: int) -> int:
+    """
+    Prochain joueur encore en jeu après joueur, dans l'ordre 1, 2, ... (cyclique),
+    comme ColorWarsGame.joueur_suivant. Si plus personne d'autre n'a de
+    jetons, retourne joueur lui-même.
+    """
+    jetons = plateau.jetons_joueur
+    nb = len(jetons) - 1
+    suivant = joueur
+    for _ in range(nb):
+        suivant = suivant % nb + 1
+        if jetons[suivant]:
+            return suivant
+    return joueur
 
 def compter_jetons(plateau: Plateau, joueur: int) -> int:
     """Compte le nombre total de jetons d'un joueur"""
-    return sum(
-        cell.jeton
-        for row in plateau
-        for cell in row
-        if cell.joueur == joueur
-    )
\ No newline at end of file
+    return plateau.jetons_joueur[joueur]
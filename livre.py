@@ -0,0 +1,337 @@
+"""
+Livre d'ouvertures: placement initial et premiers coups précalculés.
+
+    python livre.py construire --taille 10 --joueurs 2
+    python livre.py consulter --taille 10 --joueurs 2
+
+Le livre est construit hors ligne par une recherche profonde de la phase de
+placement (paranoïaque, comme minimax_alpha_beta: les adversaires du joueur
+qui place s'entendent contre lui) puis des premiers coups. Il y a un fichier
+par taille de plateau et nombre de joueurs (livres/livre_<taille>_<n>j.bin).
+
+Format: un en-tête, puis des enregistrements (clé 64 bits, case) triés par
+clé. Le fichier est projeté en mémoire (mmap) au premier besoin et consulté
+par dichotomie: rien n'est chargé au démarrage, et une consultation ne
+coûte que quelques lectures.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from random import Random
+
+import minimax
+from game import (
+    create_board, placer_jeton_initial, jouer_coup, coups_possibles, cases_joueur, joueur_suivant,
+    BOARD_SIZE, MAX_JOUEURS
+)
+from statistiques import StatsRecherche
+
+DOSSIER_LIVRES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "livres")
+
+# En-tête: signature, version, taille, nombre de joueurs, nombre d'enregistrements
+FORMAT_ENTETE = struct.Struct("<4sBBBxI")
+SIGNATURE = b"CWLV"
+VERSION = 1
+# Enregistrement: clé de la position, case à jouer (x * taille + y)
+FORMAT_ENTREE = struct.Struct("<QH")
+
+# Paramètres de construction par défaut
+PROFONDEUR_LIVRE = 4     # Profondeur de recherche après le placement
+PLIS_LIVRE = None        # Plis couverts (None: 3 par joueur, placement compris)
+LARGEUR_LIVRE = 4        # Coups suivis par position (les meilleurs)
+PLIS_COMPLETS = 1        # Premiers plis dont tous les coups sont suivis
+CANDIDATS_REPONSE = 6    # Placements adverses examinés dans la recherche
+PROFONDEUR_TRI = 2       # Profondeur de l'estimation qui les choisit
+
+# Clés de contexte: joueur au trait, phase de placement
+_rng_cles = Random(0x11_B0E)
+_CLES_TRAIT = [_rng_cles.getrandbits(64) for _ in range(MAX_JOUEURS + 1)]
+_CLE_PLACEMENT = _rng_cles.getrandbits(64)
+
+
+def cle_livre(plateau, joueur, placement=False):
+    """Clé d'une position du livre: hash de Zobrist, joueur au trait et phase"""
+    return plateau.zobrist ^ _CLES_TRAIT[joueur] ^ (_CLE_PLACEMENT if placement else 0)
+
+
+def chemin_livre(size, nb_joueurs):
+    return os.path.join(DOSSIER_LIVRES, f"livre_{size}_{nb_joueurs}j.bin")
+
+
+# -----------------------
+# CONSULTATION
+# -----------------------
+class LivreOuvertures:
+    """Livre projeté en mémoire; le fichier n'est ouvert qu'à la première consultation"""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+        self._donnees = None
+        self.size = None
+        self.nb_joueurs = None
+        self.nb_entrees = 0
+
+    def _ouvrir(self):
+        with open(self.chemin, "rb") as f:
+            self._donnees = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        signature, version, self.size, self.nb_joueurs, self.nb_entrees = FORMAT_ENTETE.unpack_from(self._donnees)
+        if signature != SIGNATURE or version != VERSION:
+            raise ValueError(f"{self.chemin}: livre d'ouvertures invalide")
+
+    def chercher(self, cle):
+        """Case (indice plat) associée à cle, ou None"""
+        if self._donnees is None:
+            self._ouvrir()
+        donnees = self._donnees
+        debut = FORMAT_ENTETE.size
+        taille = FORMAT_ENTREE.size
+        bas, haut = 0, self.nb_entrees
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            cle_milieu, case = FORMAT_ENTREE.unpack_from(donnees, debut + milieu * taille)
+            if cle_milieu < cle:
+                bas = milieu + 1
+            elif cle_milieu > cle:
+                haut = milieu
+            else:
+                return case
+        return None
+
+    def fermer(self):
+        if self._donnees is not None:
+            self._donnees.close()
+            self._donnees = None
+
+
+# (taille, nb_joueurs) -> LivreOuvertures, ou None si le fichier n'existe pas
+_livres = {}
+
+
+def coup_livre(plateau, joueur, nb_joueurs, placement=False):
+    """
+    Coup du livre pour joueur dans cette position.
+
+    Args:
+        plateau: Position actuelle
+        joueur: Joueur au trait
+        nb_joueurs: Nombre de joueurs de la partie
+        placement: True pendant la phase de placement initial
+
+    Returns:
+        Le coup (x, y), ou None si la position n'est pas dans le livre (ou si
+        le coup trouvé n'est pas jouable: collision de clés)
+    """
+    cle_fichier = (plateau.size, nb_joueurs)
+    if cle_fichier not in _livres:
+        chemin = chemin_livre(*cle_fichier)
+        _livres[cle_fichier] = LivreOuvertures(chemin) if os.path.exists(chemin) else None
+    livre = _livres[cle_fichier]
+    if livre is None:
+        return None
+    i = livre.chercher(cle_livre(plateau, joueur, placement))
+    if i is None or i >= plateau.size * plateau.size:
+        return None
+    proprietaire = plateau.cases[2 * i]
+    if (placement and proprietaire != 0) or (not placement and proprietaire != joueur):
+        return None
+    return divmod(i, plateau.size)
+
+
+# -----------------------
+# CONSTRUCTION
+# -----------------------
+def _cases_vides(plateau):
+    """Cases vides, du centre vers les bords (à score égal, la plus centrale l'emporte)"""
+    size = plateau.size
+    centre = (size - 1) / 2
+    vides = cases_joueur(plateau, 0)
+    vides.sort(key=lambda i: abs(i // size - centre) + abs(i % size - centre))
+    return vides
+
+
+def _placer(plateau, i, joueur):
+    enfant = plateau.copie()
+    placer_jeton_initial(enfant, i // plateau.size, i % plateau.size, joueur)
+    return enfant
+
+
+class _Recherche:
+    """Recherche de la phase de placement (paramètres et mémoïsation d'une construction)"""
+
+    def __init__(self, nb_joueurs, profondeur):
+        self.nb_joueurs = nb_joueurs
+        self.profondeur = profondeur
+        self.stats = StatsRecherche()
+        self.memo = {}
+
+    def valeur_jeu(self, plateau, joueur_id, profondeur):
+        """Valeur pour joueur_id d'une position de jeu où le joueur 1 a le trait"""
+        trait = 1 if plateau.jetons_joueur[1] else joueur_suivant(plateau, 1)
+        return minimax.minimax_alpha_beta(plateau, joueur_id, trait, profondeur, stats=self.stats)[0]
+
+    def valeur_placement(self, plateau, joueur_id, placeur):
+        """
+        Valeur pour joueur_id quand placeur doit placer son jeton initial
+        (placeur > nb_joueurs: placement terminé).
+
+        joueur_id examine toutes les cases vides; un adversaire seulement les
+        CANDIDATS_REPONSE meilleures selon une recherche courte où les
+        joueurs qui n'ont pas encore placé sont absents.
+        """
+        if placeur > self.nb_joueurs:
+            return self.valeur_jeu(plateau, joueur_id, self.profondeur)
+        cle = (plateau.zobrist, joueur_id, placeur)
+        if cle in self.memo:
+            return self.memo[cle]
+        enfants = [_placer(plateau, i, placeur) for i in _cases_vides(plateau)]
+        if placeur == joueur_id:
+            valeur = max(self.valeur_placement(enfant, joueur_id, placeur + 1) for enfant in enfants)
+        else:
+            enfants.sort(key=lambda enfant: -self.valeur_jeu(enfant, placeur, PROFONDEUR_TRI))
+            valeur = min(self.valeur_placement(enfant, joueur_id, placeur + 1)
+                         for enfant in enfants[:CANDIDATS_REPONSE])
+        self.memo[cle] = valeur
+        return valeur
+
+    def coups_notes(self, plateau, joueur, placement):
+        """Tous les coups de joueur avec leur valeur pour lui, du meilleur au moins bon"""
+        notes = []
+        if placement:
+            for i in _cases_vides(plateau):
+                notes.append((self.valeur_placement(_placer(plateau, i, joueur), joueur, joueur + 1), i))
+        else:
+            for x, y in coups_possibles(plateau, joueur):
+                enfant = plateau.copie()
+                jouer_coup(enfant, x, y, joueur)
+                suivant = joueur_suivant(enfant, joueur)
+                if suivant == joueur:
+                    valeur = float('inf')
+                else:
+                    valeur = minimax.minimax_alpha_beta(enfant, joueur, suivant, self.profondeur - 1,
+                                                        stats=self.stats)[0]
+                notes.append((valeur, x * plateau.size + y))
+        # Tri stable: à valeur égale, l'ordre des cases (le centre d'abord) est gardé
+        notes.sort(key=lambda note: -note[0])
+        return notes
+
+
+def construire_livre(size=BOARD_SIZE, nb_joueurs=2, profondeur=PROFONDEUR_LIVRE, plis=PLIS_LIVRE,
+                     largeur=LARGEUR_LIVRE, plis_complets=PLIS_COMPLETS, sortie=None, flux=sys.stdout):
+    """
+    Construit le livre d'un plateau size x size à nb_joueurs.
+
+    Les positions sont parcourues en largeur depuis le plateau vide: pour
+    chacune, le meilleur coup est enregistré, puis les positions atteintes
+    par les largeur meilleurs coups (tous pendant les plis_complets premiers
+    plis) sont examinées au pli suivant.
+
+    Returns:
+        Nombre d'entrées écrites
+    """
+    if plis is None:
+        plis = 3 * nb_joueurs
+    sortie = sortie or chemin_livre(size, nb_joueurs)
+    recherche = _Recherche(nb_joueurs, profondeur)
+    minimax.vider_cache()
+    entrees = {}
+    # (plateau, joueur au trait, phase de placement)
+    niveau = [(create_board(size), 1, True)]
+    debut = time.perf_counter()
+    for pli in range(plis):
+        suivant = []
+        for plateau, joueur, placement in niveau:
+            cle = cle_livre(plateau, joueur, placement)
+            if cle in entrees:
+                continue
+            notes = recherche.coups_notes(plateau, joueur, placement)
+            if not notes:
+                continue
+            entrees[cle] = notes[0][1]
+            if pli + 1 == plis:
+                continue
+            for _, i in (notes if pli < plis_complets else notes[:largeur]):
+                if placement:
+                    enfant = _placer(plateau, i, joueur)
+                    if joueur < nb_joueurs:
+                        suivant.append((enfant, joueur + 1, True))
+                    else:
+                        trait = 1 if enfant.jetons_joueur[1] else joueur_suivant(enfant, 1)
+                        suivant.append((enfant, trait, False))
+                else:
+                    enfant = plateau.copie()
+                    jouer_coup(enfant, i // size, i % size, joueur)
+                    trait = joueur_suivant(enfant, joueur)
+                    if trait != joueur:
+                        suivant.append((enfant, trait, False))
+        print(f"pli {pli + 1}/{plis}: {len(niveau)} positions, {len(entrees)} entrées"
+              f" ({time.perf_counter() - debut:.1f} s)", file=flux)
+        niveau = suivant
+
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "wb") as f:
+        f.write(FORMAT_ENTETE.pack(SIGNATURE, VERSION, size, nb_joueurs, len(entrees)))
+        for cle in sorted(entrees):
+            f.write(FORMAT_ENTREE.pack(cle, entrees[cle]))
+    _livres.pop((size, nb_joueurs), None)
+    return len(entrees)
+
+
+# -----------------------
+# LIGNE DE COMMANDE
+# -----------------------
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Livre d'ouvertures (placement et premiers coups)")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    p_construire = commandes.add_parser("construire", help="Construire un livre")
+    p_construire.add_argument("--taille", type=int, default=BOARD_SIZE)
+    p_construire.add_argument("--joueurs", type=int, default=2)
+    p_construire.add_argument("--profondeur", type=int, default=PROFONDEUR_LIVRE,
+                              help="Profondeur de recherche après le placement")
+    p_construire.add_argument("--plis", type=int, default=PLIS_LIVRE,
+                              help="Plis couverts (défaut: 3 par joueur, placement compris)")
+    p_construire.add_argument("--largeur", type=int, default=LARGEUR_LIVRE, help="Coups suivis par position")
+    p_construire.add_argument("--complets", type=int, default=PLIS_COMPLETS,
+                              help="Premiers plis dont tous les coups sont suivis")
+    p_construire.add_argument("--sortie", default=None, help="Fichier (défaut: livres/livre_<taille>_<n>j.bin)")
+
+    p_consulter = commandes.add_parser("consulter", help="Afficher l'ouverture du livre")
+    p_consulter.add_argument("--taille", type=int, default=BOARD_SIZE)
+    p_consulter.add_argument("--joueurs", type=int, default=2)
+
+    args = parser.parse_args(arguments)
+    if not 2 <= args.joueurs <= 4:
+        parser.error("--joueurs doit être entre 2 et 4")
+
+    if args.commande == "construire":
+        n = construire_livre(args.taille, args.joueurs, args.profondeur, args.plis,
+                             args.largeur, args.complets, args.sortie)
+        print(f"{n} entrées écrites")
+    else:
+        # Suit la ligne principale du livre depuis le plateau vide
+        plateau = create_board(args.taille)
+        joueur, placement = 1, True
+        while True:
+            coup = coup_livre(plateau, joueur, args.joueurs, placement)
+            if coup is None:
+                break
+            print(f"joueur {joueur} {'place' if placement else 'joue'} en {coup}")
+            if placement:
+                placer_jeton_initial(plateau, coup[0], coup[1], joueur)
+                if joueur == args.joueurs:
+                    joueur, placement = 1, False
+                else:
+                    joueur += 1
+            else:
+                jouer_coup(plateau, coup[0], coup[1], joueur)
+                suivant = joueur_suivant(plateau, joueur)
+                if suivant == joueur:
+                    break
+                joueur = suivant
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Moteur Monte-Carlo Tree Search (UCT), alternative à minimax.py.
+
+Chaque itération descend l'arbre en choisissant l'enfant de meilleur score
+UCT, ajoute un nœud, puis termine la partie par une simulation rapide
+(coups au hasard, de préférence sur les cases à 3 jetons). Le résultat est
+remonté jusqu'à la racine. La recherche peut être arrêtée à tout moment:
+le coup le plus visité est toujours disponible.
+
+Les récompenses sont un vecteur (une valeur par joueur): la recherche
+fonctionne telle quelle de 2 à 4 joueurs, chacun maximisant sa propre
+récompense.
+"""
+import math
+import time
+from concurrent.futures import wait
+from random import Random
+
+from game import table_voisins, jouer_coup, joueur_a_perdu, joueur_suivant, cases_joueur, MAX_JOUEURS
+from minimax import valeur_joueur
+
+# Constante d'exploration UCT (récompenses dans [0, 1])
+C_UCT = 1.4
+
+# Probabilité de jouer une case à 3 jetons (si le joueur en a) en simulation
+PROBA_CRITIQUE = 0.7
+
+# Nombre maximal de coups d'une simulation; au-delà, la récompense de chaque
+# joueur est sa part de la valeur matérielle (termes de minimax.evaluer_position).
+# Des simulations courtes et nombreuses jouent nettement mieux que des parties
+# complètes au hasard.
+LONGUEUR_SIMULATION = 10
+
+# Budget par défaut si ni temps ni itérations ne sont donnés (secondes)
+TEMPS_DEFAUT = 1.0
+
+
+class NoeudMCTS:
+    """
+    Nœud de l'arbre: la position atteinte en jouant coup depuis le parent.
+
+    gains est la somme des récompenses de joueur (celui qui a joué coup):
+    c'est ce que ce joueur cherche à maximiser en choisissant ce nœud.
+    """
+
+    __slots__ = ("parent", "coup", "joueur", "trait", "cle", "enfants", "non_explores", "visites", "gains")
+
+    def __init__(self, parent, coup, joueur, trait, cle, non_explores):
+        self.parent = parent
+        self.coup = coup
+        self.joueur = joueur
+        self.trait = trait              # Joueur au trait (None: partie finie)
+        self.cle = cle                  # Hash de Zobrist de la position
+        self.enfants = []
+        self.non_explores = non_explores
+        self.visites = 0
+        self.gains = 0.0
+
+
+def _coups_joueur(plateau, joueur, autoriser_case_vide=False):
+    """Indices des cases jouables par joueur"""
+    if autoriser_case_vide:
+        return sorted(cases_joueur(plateau, joueur) + cases_joueur(plateau, 0))
+    return cases_joueur(plateau, joueur)
+
+
+def _recompenses_fin(plateau, gagnant=None):
+    """Vecteur de récompenses: 1 au gagnant, sinon la part de la valeur matérielle de chacun"""
+    recompenses = [0.0] * (MAX_JOUEURS + 1)
+    if gagnant is not None:
+        recompenses[gagnant] = 1.0
+        return recompenses
+    jetons = plateau.jetons_joueur
+    valeurs = [0.0] * len(jetons)
+    for joueur in range(1, len(jetons)):
+        if jetons[joueur]:
+            valeurs[joueur] = valeur_joueur(plateau, joueur)
+    total = sum(valeurs)
+    for joueur in range(1, len(jetons)):
+        recompenses[joueur] = valeurs[joueur] / total
+    return recompenses
+
+
+def simuler(plateau, trait, rng, longueur=LONGUEUR_SIMULATION):
+    """
+    Termine la partie par des coups rapides (le plateau est modifié).
+
+    Politique: avec une probabilité PROBA_CRITIQUE, une case à 3 jetons du
+    joueur (explosion) s'il en a, en priorité au contact d'un adversaire;
+    sinon une de ses cases au hasard.
+
+    Returns:
+        Vecteur de récompenses indexé par joueur
+    """
+    if trait is None:
+        gagnant = next(j for j in range(1, len(plateau.jetons_joueur)) if plateau.jetons_joueur[j])
+        return _recompenses_fin(plateau, gagnant)
+    size = plateau.size
+    cases = plateau.cases
+    tv = table_voisins(size)
+    aleatoire = rng.random
+    choisir = rng.choice
+    for _ in range(longueur):
+        coups = cases_joueur(plateau, trait)
+        if aleatoire() < PROBA_CRITIQUE:
+            critiques = [i for i in coups if cases[2 * i + 1] == 3]
+            if critiques:
+                captures = [i for i in critiques if any(cases[2 * v] not in (0, trait) for v in tv[i])]
+                coups = captures or critiques
+        i = choisir(coups)
+        jouer_coup(plateau, i // size, i % size, trait)
+        suivant = joueur_suivant(plateau, trait)
+        if suivant == trait:
+            return _recompenses_fin(plateau, trait)
+        trait = suivant
+    return _recompenses_fin(plateau)
+
+
+def _nouveau_noeud(parent, coup, joueur, plateau):
+    """Nœud de la position de plateau, atteinte en jouant coup"""
+    trait = joueur_suivant(plateau, joueur)
+    if trait == joueur:
+        return NoeudMCTS(parent, coup, joueur, None, plateau.zobrist, [])
+    return NoeudMCTS(parent, coup, joueur, trait, plateau.zobrist, _coups_joueur(plateau, trait))
+
+
+def _iteration(racine, plateau_racine, premier_coup, rng, constante):
+    """Une itération: sélection, expansion, simulation, rétropropagation"""
+    plateau = plateau_racine.copie()
+    size = plateau.size
+    noeud = racine
+    log = math.log
+    sqrt = math.sqrt
+
+    # Sélection: on descend tant que le nœud est entièrement développé
+    while not noeud.non_explores and noeud.enfants:
+        facteur = constante * sqrt(log(noeud.visites))
+        meilleur = None
+        meilleur_score = -1.0
+        for enfant in noeud.enfants:
+            score = enfant.gains / enfant.visites + facteur / sqrt(enfant.visites)
+            if score > meilleur_score:
+                meilleur, meilleur_score = enfant, score
+        i = meilleur.coup
+        jouer_coup(plateau, i // size, i % size, meilleur.joueur,
+                   autoriser_case_vide=premier_coup and noeud is racine)
+        noeud = meilleur
+
+    # Expansion: un coup non encore essayé
+    if noeud.non_explores:
+        coups = noeud.non_explores
+        k = rng.randrange(len(coups))
+        coups[k], coups[-1] = coups[-1], coups[k]
+        i = coups.pop()
+        jouer_coup(plateau, i // size, i % size, noeud.trait,
+                   autoriser_case_vide=premier_coup and noeud is racine)
+        enfant = _nouveau_noeud(noeud, i, noeud.trait, plateau)
+        noeud.enfants.append(enfant)
+        noeud = enfant
+
+    # Simulation puis rétropropagation
+    recompenses = simuler(plateau, noeud.trait, rng)
+    while noeud is not None:
+        noeud.visites += 1
+        if noeud.joueur is not None:
+            noeud.gains += recompenses[noeud.joueur]
+        noeud = noeud.parent
+
+
+def _nouvelle_racine(plateau, joueur):
+    premier_coup = joueur_a_perdu(plateau, joueur)
+    racine = NoeudMCTS(None, None, None, joueur, plateau.zobrist,
+                       _coups_joueur(plateau, joueur, premier_coup))
+    return racine, premier_coup
+
+
+def _developper(racine, plateau, premier_coup, rng, constante, echeance, iterations_max, arret=None):
+    """Itère jusqu'au premier budget épuisé; retourne le nombre d'itérations"""
+    iterations = 0
+    while iterations_max is None or iterations < iterations_max:
+        if echeance is not None and time.perf_counter() > echeance:
+            break
+        if arret is not None and arret.is_set():
+            break
+        _iteration(racine, plateau, premier_coup, rng, constante)
+        iterations += 1
+    return iterations
+
+
+def _recherche_processus(plateau, joueur, temps_max, iterations_max, graine, constante):
+    """
+    Tâche d'un processus du pool: un arbre indépendant depuis la racine.
+
+    Returns:
+        Dict coup -> (visites, gains) des enfants de la racine
+    """
+    racine, premier_coup = _nouvelle_racine(plateau, joueur)
+    echeance = time.perf_counter() + temps_max if temps_max is not None else None
+    _developper(racine, plateau, premier_coup, Random(graine), constante, echeance, iterations_max)
+    return {enfant.coup: (enfant.visites, enfant.gains) for enfant in racine.enfants}
+
+
+class MoteurMCTS:
+    """
+    Bot MCTS/UCT, avec réutilisation optionnelle de l'arbre d'un coup à l'autre.
+
+    Avec nb_workers > 1, la recherche est parallélisée à la racine: chaque
+    processus du pool (parallele.obtenir_pool) développe son propre arbre
+    pendant le même budget, et les visites des coups de la racine sont
+    additionnées. L'arbre du processus principal est le seul réutilisé.
+    """
+
+    def __init__(self, temps_max=None, iterations_max=None, reutiliser_arbre=False,
+                 nb_workers=None, constante=C_UCT, graine=None):
+        """
+        Args:
+            temps_max: Budget par coup en secondes
+            iterations_max: Budget par coup en itérations (par processus)
+            reutiliser_arbre: Repartir du sous-arbre de la position atteinte
+            nb_workers: Nombre de processus (None ou 1: pas de parallélisme)
+            constante: Constante d'exploration UCT
+            graine: Graine du générateur aléatoire
+        """
+        if temps_max is None and iterations_max is None:
+            temps_max = TEMPS_DEFAUT
+        self.temps_max = temps_max
+        self.iterations_max = iterations_max
+        self.reutiliser_arbre = reutiliser_arbre
+        self.nb_workers = nb_workers
+        self.constante = constante
+        self.rng = Random(graine)
+        self.racine = None
+        self.iterations = 0     # Itérations de la dernière recherche (tous processus)
+        self.reutilisations = 0  # Nombre de recherches reparties d'un ancien arbre
+
+    def _racine_reutilisable(self, plateau, joueur):
+        """Cherche la position actuelle parmi les descendants proches de l'ancienne racine"""
+        if self.racine is None:
+            return None
+        niveau = [self.racine]
+        for _ in range(MAX_JOUEURS + 1):
+            suivant = []
+            for noeud in niveau:
+                if noeud.cle == plateau.zobrist and noeud.trait == joueur:
+                    return noeud
+                suivant.extend(noeud.enfants)
+            niveau = suivant
+        return None
+
+    def chercher(self, plateau, joueur, arret=None, rng=None):
+        """
+        Cherche le meilleur coup (le plus visité), sans le jouer.
+
+        Args:
+            plateau: Position (non modifiée)
+            joueur: Joueur au trait
+            arret: threading.Event optionnel qui termine la recherche
+            rng: Générateur aléatoire (par défaut celui du moteur)
+
+        Returns:
+            Le coup (x, y), ou None si aucun coup n'est jouable
+        """
+        rng = rng or self.rng
+        racine = self._racine_reutilisable(plateau, joueur) if self.reutiliser_arbre else None
+        if racine is None:
+            racine, premier_coup = _nouvelle_racine(plateau, joueur)
+        else:
+            racine.parent = None
+            premier_coup = False
+            self.reutilisations += 1
+        if not racine.non_explores and not racine.enfants:
+            return None
+
+        debut = time.perf_counter()
+        echeance = debut + self.temps_max if self.temps_max is not None else None
+        futurs = []
+        if self.nb_workers is not None and self.nb_workers > 1:
+            from parallele import obtenir_pool
+            pool = obtenir_pool(self.nb_workers)
+            futurs = [
+                pool.submit(_recherche_processus, plateau, joueur, self.temps_max,
+                            self.iterations_max, rng.getrandbits(64), self.constante)
+                for _ in range(self.nb_workers - 1)
+            ]
+        self.iterations = _developper(racine, plateau, premier_coup, rng, self.constante,
+                                      echeance, self.iterations_max, arret)
+
+        visites = {enfant.coup: enfant.visites for enfant in racine.enfants}
+        if futurs:
+            if arret is not None and arret.is_set():
+                for futur in futurs:
+                    futur.cancel()
+            else:
+                wait(futurs)
+                for futur in futurs:
+                    if futur.cancelled():
+                        continue
+                    for coup, (n, _) in futur.result().items():
+                        visites[coup] = visites.get(coup, 0) + n
+                        self.iterations += n
+
+        self.racine = racine if self.reutiliser_arbre else None
+        if not visites:
+            # Arrêté avant la première itération: n'importe quel coup jouable
+            i = racine.non_explores[0]
+        else:
+            i = max(visites, key=visites.get)
+        if self.reutiliser_arbre:
+            self.racine = next((e for e in racine.enfants if e.coup == i), None)
+        return divmod(i, plateau.size)
+
+    def __call__(self, plateau, joueur, rng=None):
+        return self.chercher(plateau, joueur, rng=rng)
+
+
+def mcts_bot(plateau, joueur_id, temps_max=TEMPS_DEFAUT, nb_workers=None):
+    """
+    Équivalent de minimax.minimax_bot avec le moteur MCTS: cherche et joue le coup.
+
+    Returns:
+        True si un coup a été joué, False sinon
+    """
+    premier_coup = joueur_a_perdu(plateau, joueur_id)
+    coup = MoteurMCTS(temps_max=temps_max, nb_workers=nb_workers).chercher(plateau, joueur_id)
+    if coup:
+        jouer_coup(plateau, coup[0], coup[1], joueur_id, autoriser_case_vide=premier_coup)
+        return True
+    return False
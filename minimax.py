@@ -1,15 +1,94 @@
-from random import choice
-from copy import deepcopy
-from game import coups_possibles, jouer_coup, compter_jetons
+import time
+from random import Random
+from game import (
+    coups_possibles, jouer_coup, annuler_coup, joueur_a_perdu, joueur_suivant, MAX_JOUEURS,
+    table_symetries, INVERSES_SYMETRIES, NB_SYMETRIES, MASQUE_ZOBRIST, calculer_zobrist_symetries
+)
+from transposition import TableTransposition, EXACTE, INFERIEURE, SUPERIEURE
+from statistiques import StatsRecherche
+from finale import en_finale, resoudre, vider_table as vider_table_finale, NOEUDS_FINALE
 
 # Profondeur maximale de l'arbre de jeu à explorer
 profondeur_max = 3
 
-# Cache global pour mémoriser les états déjà calculés et éviter les recalculs
-cache_arbre = {}
+# Capacité de la table de transposition (mégaoctets)
+TAILLE_CACHE_MO = 32
 
-# Statistiques pour le debug (nombre de nœuds élaguées)
-stats_elagage = {"noeuds_elagues": 0, "noeuds_explores": 0}
+# Si True, chaque entrée du cache garde une copie du plateau pour détecter
+# les collisions du hash de Zobrist (plus lent, pour le debug)
+VERIFIER_COLLISIONS = False
+
+# Table de transposition globale: taille fixe, conservée d'un tour à l'autre
+cache_arbre = TableTransposition(TAILLE_CACHE_MO, verifier=VERIFIER_COLLISIONS)
+
+# Valeurs mélangées au hash du plateau pour distinguer le contexte du nœud
+# (joueur pour qui on calcule, joueur au trait, case vide autorisée)
+_rng_contexte = Random(0xC0FFEE)
+_cles_contexte = [_rng_contexte.getrandbits(64) for _ in range(2 * (MAX_JOUEURS + 1) ** 2)]
+
+# Si True, un plateau et ses 7 images par rotation ou symétrie partagent la
+# même entrée de table (voir cle_et_symetrie)
+CLES_SYMETRIQUES = True
+
+# Statistiques de la dernière recherche terminée (StatsRecherche), pour le debug.
+# Chaque recherche remplit son propre objet: voir rechercher
+dernieres_stats = None
+
+# Numéro de la recherche en cours, incrémenté par rechercher et jamais remis à
+# zéro (contrairement à l'âge de la table, que vider_cache réinitialise): les
+# processus de parallele.py vieillissent leur table quand il change
+numero_recherche = 0
+
+# Profondeur maximale de l'approfondissement itératif quand un budget est donné
+PROFONDEUR_LIMITE = 32
+
+# Budget de la recherche en cours (None = pas de limite)
+# - echeance: instant time.perf_counter() à ne pas dépasser
+# - noeuds_max: nombre maximal de nœuds explorés
+# - arret: threading.Event qui, une fois levé, interrompt la recherche
+limites_recherche = {"echeance": None, "noeuds_max": None, "arret": None}
+
+# Part du budget (temps et nœuds) accordée à la résolution exacte des fins de
+# partie: le reste est garanti à la recherche normale
+FRACTION_FINALE = 0.25
+
+# Cache persistant des analyses (cache_disque.CacheDisque), None = désactivé.
+# Voir activer_cache_disque. Seuls les nœuds proches de la racine (ply <=
+# PLY_CACHE_DISQUE) et assez profonds y passent: ce sont ceux qui reviennent
+# d'une partie à l'autre, et une requête coûte bien plus qu'une sonde en mémoire.
+cache_persistant = None
+PLY_CACHE_DISQUE = 2
+PROFONDEUR_MIN_DISQUE = 2
+
+
+# Heuristiques d'ordonnancement des coups (remises à zéro à chaque recherche)
+# - coups_killers: ply -> jusqu'à 2 coups « calmes » ayant provoqué une coupure
+# - historique: (joueur, coup) -> somme des profondeur² des coupures provoquées
+coups_killers = {}
+historique = {}
+NB_KILLERS = 2
+
+# Priorités des classes de coups (la plus haute est essayée en premier)
+PRIORITE_TT = 1 << 40
+PRIORITE_EXPLOSION = 1 << 30
+PRIORITE_KILLER = 1 << 25
+
+
+# Évaluation par lots des nœuds de profondeur 1 (voir activer_frontiere_numpy)
+_scores_frontiere = None
+
+# Poids de l'évaluation: bonus par case à 3, 2 et 1 jetons, par voisin du
+# même joueur d'une case à 3 jetons (chaîne), et malus par case à 3 jetons
+# d'un adversaire qui en a plusieurs (menace)
+BONUS_CASE_3 = 15
+BONUS_CASE_2 = 5
+BONUS_CASE_1 = 2
+BONUS_CHAINE = 3
+MALUS_MENACE = 10
+
+
+class RechercheInterrompue(Exception):
+    """Levée dans l'arbre quand le budget de temps ou de nœuds est épuisé"""
 
 
 def plateau_to_key(plateau):
@@ -17,18 +96,16 @@ def plateau_to_key(plateau):
     Convertit le plateau en clé hashable pour le cache.
     
     Permet de sauvegarder les états du plateau pour éviter les recalculs.
-    Transforme la liste 2D de Cell en tuple imbriqué (joueur, jeton).
+    Le hash de Zobrist est maintenu par le plateau à chaque coup: la clé
+    coûte O(1) quelle que soit la taille du changement.
     
     Args:
-        plateau: La grille de jeu (List[List[Cell]])
+        plateau: La grille de jeu (Plateau)
     
     Returns:
-        Un tuple imbriqué représentant l'état du plateau
+        Le hash de Zobrist 64 bits du plateau (int)
     """
-    return tuple(
-        tuple((cell.joueur, cell.jeton) for cell in row)
-        for row in plateau
-    )
+    return plateau.zobrist
 
 
 def evaluer_plateau(plateau, joueur_id, adversaire_id):
@@ -43,84 +120,44 @@ def evaluer_plateau(plateau, joueur_id, adversaire_id):
     5. Les menaces imminentes de l'adversaire
     
     Args:
-        plateau: La grille de jeu (List[List[Cell]])
+        plateau: La grille de jeu (Plateau)
         joueur_id: ID du joueur (1 ou 2)
         adversaire_id: ID de l'adversaire
     
     Returns:
         Score évalué (int)
     """
-    from game import BOARD_SIZE, voisins
+    # Toutes les grandeurs sont tenues à jour par le plateau à chaque coup:
+    # l'évaluation est O(1)
+    jetons = plateau.jetons_joueur
+    comptes = plateau.comptes
+    chaines = plateau.chaines
+    nous = 4 * joueur_id
+    eux = 4 * adversaire_id
     
     # Score de base: différence de jetons
-    score_nous = compter_jetons(plateau, joueur_id)
-    score_adversaire = compter_jetons(plateau, adversaire_id)
-    score_base = score_nous - score_adversaire
+    score_base = jetons[joueur_id] - jetons[adversaire_id]
     
-    bonus_nous = 0
-    malus_adversaire = 0
-    
-    # Analyser chaque cellule du plateau
-    for x in range(BOARD_SIZE):
-        for y in range(BOARD_SIZE):
-            cell = plateau[x][y]
-            
-            # === CELLULES PRÊTES À EXPLOSER (3 jetons) ===
-            # C'est CRUCIAL - avoir une cellule prête à exploser est très avantageux
-            if cell.jeton == 3:
-                if cell.joueur == joueur_id:
-                    bonus_nous += 15  # Grand bonus si on peut exploser
-                elif cell.joueur == adversaire_id:
-                    malus_adversaire += 15  # Alerte: l'adversaire peut exploser!
-            
-            # === CELLULES À 2 JETONS ===
-            # Proches de l'explosion, à surveiller
-            elif cell.jeton == 2:
-                if cell.joueur == joueur_id:
-                    bonus_nous += 5
-                elif cell.joueur == adversaire_id:
-                    malus_adversaire += 5
-            
-            # === CELLULES CONTRÔLÉES ===
-            # Bonus pour les zones défendues
-            elif cell.jeton >= 1:
-                if cell.joueur == joueur_id:
-                    bonus_nous += 2
-                elif cell.joueur == adversaire_id:
-                    malus_adversaire += 2
+    # === CELLULES PRÊTES À EXPLOSER (3 jetons) ===
+    # C'est CRUCIAL - avoir une cellule prête à exploser est très avantageux
+    # === CELLULES À 2 JETONS === Proches de l'explosion, à surveiller
+    # === CELLULES CONTRÔLÉES (1 jeton) === Bonus pour les zones défendues
+    bonus_nous = (BONUS_CASE_3 * comptes[nous + 3] + BONUS_CASE_2 * comptes[nous + 2]
+                  + BONUS_CASE_1 * comptes[nous + 1])
+    malus_adversaire = (BONUS_CASE_3 * comptes[eux + 3] + BONUS_CASE_2 * comptes[eux + 2]
+                        + BONUS_CASE_1 * comptes[eux + 1])
     
     # === ANALYSE DES CHAÎNES D'EXPLOSION POTENTIELLES ===
-    # Identifier les positions stratégiques qui pourraient trigger des explosions en cascade
-    for x in range(BOARD_SIZE):
-        for y in range(BOARD_SIZE):
-            cell = plateau[x][y]
-            
-            if cell.jeton == 3 and cell.joueur != 0:
-                joueur_cell = cell.joueur
-                voisins_list = voisins(x, y)
-                
-                # Compter les voisins du même joueur
-                voisins_memes = sum(
-                    1 for nx, ny in voisins_list
-                    if plateau[nx][ny].joueur == joueur_cell and plateau[nx][ny].jeton > 0
-                )
-                
-                # Bonus additionnel si explosion en chaîne probable
-                bonus_chaine = voisins_memes * 3
-                
-                if joueur_cell == joueur_id:
-                    bonus_nous += bonus_chaine
-                else:
-                    malus_adversaire += bonus_chaine
+    # Chaque voisin du même joueur d'une cellule à 3 jetons vaut 3 points,
+    # en bonus pour nous et en malus pour tous les autres joueurs
+    bonus_nous += BONUS_CHAINE * chaines[joueur_id]
+    malus_adversaire += BONUS_CHAINE * (sum(chaines) - chaines[joueur_id])
     
     # === MENACES IMMINENTES DE L'ADVERSAIRE ===
     # Pénalité si l'adversaire a plusieurs cellules prêtes à exploser
-    cellules_pret_exploser_adversaire = sum(
-        1 for row in plateau for cell in row
-        if cell.joueur == adversaire_id and cell.jeton == 3
-    )
+    cellules_pret_exploser_adversaire = comptes[eux + 3]
     if cellules_pret_exploser_adversaire > 1:
-        malus_adversaire += cellules_pret_exploser_adversaire * 10
+        malus_adversaire += cellules_pret_exploser_adversaire * MALUS_MENACE
     
     # === SCORE FINAL COMBINÉ ===
     # Structure: Score brut + bonus - malus
@@ -130,8 +167,228 @@ def evaluer_plateau(plateau, joueur_id, adversaire_id):
     return score_final
 
 
-def minimax_alpha_beta(plateau, joueur_id, adversaire_id, profondeur, est_maximisant, 
-                       alpha=float('-inf'), beta=float('inf'), autoriser_case_vide=False):
+def evaluer_position(plateau, joueur_id):
+    """
+    Évalue le plateau pour joueur_id face à tous ses adversaires.
+    
+    Chaque adversaire encore en jeu compte comme l'adversaire unique de
+    evaluer_plateau (jetons, cellules à 3, 2 et 1 jetons, chaînes, menaces):
+    dans une partie à deux joueurs, le score est exactement celui de
+    evaluer_plateau(plateau, joueur_id, 3 - joueur_id).
+    
+    Returns:
+        Score évalué (int)
+    """
+    jetons = plateau.jetons_joueur
+    comptes = plateau.comptes
+    chaines = plateau.chaines
+    score = 0
+    for joueur in range(1, len(jetons)):
+        if not jetons[joueur]:
+            continue
+        # Même calcul que valeur_joueur, sans l'appel (fonction la plus appelée)
+        k = 4 * joueur
+        valeur = (jetons[joueur] + BONUS_CASE_3 * comptes[k + 3] + BONUS_CASE_2 * comptes[k + 2]
+                  + BONUS_CASE_1 * comptes[k + 1] + BONUS_CHAINE * chaines[joueur])
+        if joueur == joueur_id:
+            score += valeur
+        else:
+            score -= valeur
+            # Menaces imminentes: plusieurs cellules prêtes à exploser
+            if comptes[k + 3] > 1:
+                score -= MALUS_MENACE * comptes[k + 3]
+    return score
+
+
+def valeur_joueur(plateau, joueur):
+    """
+    Valeur de la position d'un joueur, sans les menaces: jetons, cellules à
+    3, 2 et 1 jetons et chaînes (la part de chaque joueur dans evaluer_position)
+    """
+    comptes = plateau.comptes
+    k = 4 * joueur
+    return (plateau.jetons_joueur[joueur] + BONUS_CASE_3 * comptes[k + 3] + BONUS_CASE_2 * comptes[k + 2]
+            + BONUS_CASE_1 * comptes[k + 1] + BONUS_CHAINE * plateau.chaines[joueur])
+
+
+def cle_et_symetrie(plateau, joueur_id, trait, autoriser_case_vide):
+    """
+    Clé de table de transposition d'un nœud de recherche, et symétrie qui
+    envoie le plateau sur sa forme canonique.
+    
+    Combine le hash de Zobrist du plateau avec le contexte du nœud: le même
+    plateau n'a pas le même score selon le joueur évalué et le joueur au trait.
+    Avec CLES_SYMETRIQUES, le hash est le plus petit de ceux des 8 images du
+    plateau (Plateau.zobrist_symetries, calculé au premier appel sur le
+    plateau puis tenu à jour): les coups stockés sous cette clé sont exprimés
+    dans le repère de l'image retenue (voir _vers_canonique).
+    
+    Returns:
+        Tuple (cle, symetrie), symetrie 0 (identité) sans CLES_SYMETRIQUES
+    """
+    contexte = _cles_contexte[2 * ((MAX_JOUEURS + 1) * joueur_id + trait) + autoriser_case_vide]
+    if not CLES_SYMETRIQUES:
+        return plateau_to_key(plateau) ^ contexte, 0
+    h = plateau.zobrist_symetries
+    if h is None:
+        h = calculer_zobrist_symetries(plateau)
+    meilleur = h & MASQUE_ZOBRIST
+    symetrie = 0
+    for s in range(1, NB_SYMETRIES):
+        h >>= 64
+        if h & MASQUE_ZOBRIST < meilleur:
+            meilleur = h & MASQUE_ZOBRIST
+            symetrie = s
+    return meilleur ^ contexte, symetrie
+
+
+def cle_noeud(plateau, joueur_id, trait, autoriser_case_vide):
+    """Clé de table de transposition d'un nœud de recherche (voir cle_et_symetrie)"""
+    return cle_et_symetrie(plateau, joueur_id, trait, autoriser_case_vide)[0]
+
+
+def _vers_canonique(plateau, coup, symetrie):
+    """Indice plat, dans le repère canonique, d'un coup (x, y) du plateau (-1 si None)"""
+    if coup is None:
+        return -1
+    return table_symetries(plateau.size)[symetrie][coup[0] * plateau.size + coup[1]]
+
+
+def _depuis_canonique(plateau, index, symetrie):
+    """Coup (x, y) du plateau correspondant à un indice du repère canonique (None si -1)"""
+    if index < 0:
+        return None
+    return divmod(table_symetries(plateau.size)[INVERSES_SYMETRIES[symetrie]][index], plateau.size)
+
+
+def _signature(plateau, symetrie):
+    """Octets de la forme canonique du plateau si la table vérifie les collisions, sinon None"""
+    if not cache_arbre.verifier:
+        return None
+    cases = plateau.cases
+    image = bytearray(len(cases))
+    for i, j in enumerate(table_symetries(plateau.size)[symetrie]):
+        image[2 * j] = cases[2 * i]
+        image[2 * j + 1] = cases[2 * i + 1]
+    return bytes(image)
+
+
+def ordonner_coups(plateau, coups, joueur, coup_tt=None, ply=0):
+    """
+    Trie les coups pour maximiser les coupures alpha-bêta.
+    
+    Ordre d'essai:
+    1. Le meilleur coup de la table de transposition
+    2. Les coups qui déclenchent une explosion (case à 3 jetons), ceux qui
+       touchent le plus de cases adverses (captures) en premier
+    3. Les coups killers de ce ply
+    4. Les autres coups, par score d'historique décroissant
+    
+    Le tri est stable: à priorité égale, l'ordre d'origine est conservé.
+    
+    Args:
+        coups: Liste de coups (x, y), triée sur place
+        joueur: Joueur qui joue ces coups
+        coup_tt: Meilleur coup connu pour cette position (ou None)
+        ply: Distance à la racine (pour les killers)
+    
+    Returns:
+        La liste coups triée
+    """
+    cases = plateau.cases
+    size = plateau.size
+    table = plateau.voisins
+    killers = coups_killers.get(ply, ())
+    
+    def priorite(coup):
+        if coup == coup_tt:
+            return PRIORITE_TT
+        i = coup[0] * size + coup[1]
+        k = i << 1
+        if cases[k] == joueur and cases[k + 1] == 3:
+            captures = 0
+            for iv in table[i]:
+                proprietaire = cases[iv << 1]
+                if proprietaire != 0 and proprietaire != joueur:
+                    captures += 1
+            return PRIORITE_EXPLOSION + captures
+        if coup in killers:
+            return PRIORITE_KILLER
+        return min(historique.get((joueur, coup), 0), PRIORITE_KILLER - 1)
+    
+    coups.sort(key=priorite, reverse=True)
+    return coups
+
+
+def _noter_coupure(plateau, coup, joueur, profondeur, ply):
+    """Met à jour killers et historique après une coupure provoquée par coup"""
+    x, y = coup
+    k = 2 * (x * plateau.size + y)
+    if plateau.cases[k] == joueur and plateau.cases[k + 1] == 3:
+        return  # Les explosions sont déjà essayées tôt
+    killers = coups_killers.setdefault(ply, [])
+    if coup not in killers:
+        killers.insert(0, coup)
+        del killers[NB_KILLERS:]
+    historique[(joueur, coup)] = historique.get((joueur, coup), 0) + profondeur * profondeur
+
+
+def activer_frontiere_numpy(actif=True):
+    """
+    Active (ou désactive) le mode frontière par lots.
+    
+    Dans ce mode, un nœud de profondeur 1 génère tous ses enfants d'un coup
+    dans un tableau NumPy, résout leurs explosions de façon vectorisée et
+    les évalue en un seul appel (evaluation_numpy.scores_frontiere). Les
+    résultats sont identiques au mode scalaire, game.PAS_EXPLOSION_MAX compris;
+    NumPy est requis.
+    """
+    global _scores_frontiere
+    if actif:
+        from evaluation_numpy import scores_frontiere
+        _scores_frontiere = scores_frontiere
+    else:
+        _scores_frontiere = None
+
+
+def activer_cache_disque(chemin=None):
+    """
+    Active (ou, sans chemin, désactive) le cache persistant des analyses.
+    
+    Les nœuds proches de la racine sont conservés dans un fichier SQLite
+    (voir cache_disque.py), relu d'une partie et d'un processus à l'autre:
+    une position déjà analysée aussi profondément n'est pas recherchée à
+    nouveau. Les processus de parallele.py ouvrent le même fichier.
+    """
+    global cache_persistant
+    if cache_persistant is not None:
+        cache_persistant.fermer()
+    if chemin:
+        from cache_disque import CacheDisque
+        cache_persistant = CacheDisque(chemin)
+    else:
+        cache_persistant = None
+
+
+def _verifier_budget(stats):
+    """Interrompt la recherche si le budget est dépassé ou si l'arrêt est demandé"""
+    noeuds = stats.noeuds_explores
+    noeuds_max = limites_recherche["noeuds_max"]
+    if noeuds_max is not None and noeuds > noeuds_max:
+        raise RechercheInterrompue()
+    # L'horloge et la demande d'arrêt ne sont lues que tous les 256 nœuds
+    if noeuds & 0xFF == 0:
+        echeance = limites_recherche["echeance"]
+        if echeance is not None and time.perf_counter() > echeance:
+            raise RechercheInterrompue()
+        arret = limites_recherche["arret"]
+        if arret is not None and arret.is_set():
+            raise RechercheInterrompue()
+
+
+def minimax_alpha_beta(plateau, joueur_id, trait, profondeur,
+                       alpha=float('-inf'), beta=float('inf'), autoriser_case_vide=False, ply=0,
+                       stats=None):
     """
     Algorithme Minimax avec élagage Alpha-Bêta (Alpha-Beta Pruning).
     
@@ -143,137 +400,551 @@ def minimax_alpha_beta(plateau, joueur_id, adversaire_id, profondeur, est_maximi
     - beta: Le meilleur score que le joueur minimisant peut garantir
     - Si beta <= alpha, on peut élaguer la branche (pruning)
     
+    À plus de deux joueurs, la recherche est « paranoïaque »: tous les
+    adversaires sont supposés jouer ensemble contre joueur_id. Les joueurs
+    jouent à tour de rôle (game.joueur_suivant, les éliminés sont sautés);
+    joueur_id maximise, chacun des autres minimise. L'arbre reste un arbre
+    à deux camps: l'élagage alpha-bêta s'applique tel quel.
+    
     Args:
-        plateau: La grille de jeu (List[List[Cell]])
-        joueur_id: ID du joueur pour lequel on calcule (1 ou 2)
-        adversaire_id: ID de l'adversaire (l'autre joueur)
+        plateau: La grille de jeu (Plateau)
+        joueur_id: ID du joueur pour lequel on calcule
+        trait: ID du joueur qui joue à ce nœud (joueur_id: maximise,
+               un adversaire: minimise)
         profondeur: Profondeur restante à explorer (0 = condition d'arrêt)
-        est_maximisant: True si c'est le tour du joueur (maximize), False si tour adversaire (minimize)
         alpha: Meilleur score pour le maximisant (initialement -inf)
         beta: Meilleur score pour le minimisant (initialement +inf)
         autoriser_case_vide: True si on peut jouer sur une case vide
+        ply: Distance à la racine (pour les coups killers)
+        stats: StatsRecherche de la recherche en cours (une nouvelle si None)
     
     Returns:
         Tuple (meilleur_score, meilleur_coup)
     """
-    global stats_elagage
+    if stats is None:
+        stats = StatsRecherche()
+    chrono = stats.chronometrer
     
     # ===== CONDITION D'ARRÊT =====
     # Quand profondeur = 0, on évalue la position et on retourne
     if profondeur == 0:
-        score = evaluer_plateau(plateau, joueur_id, adversaire_id)
+        if chrono:
+            debut = time.perf_counter()
+        score = evaluer_position(plateau, joueur_id)
+        if chrono:
+            stats.temps_evaluation += time.perf_counter() - debut
         return score, None
     
+    # ===== FIN DE PARTIE =====
+    # joueur_id éliminé: perdu; plus aucun adversaire: gagné
+    jetons = plateau.jetons_joueur
+    if not autoriser_case_vide:
+        if not jetons[joueur_id]:
+            return float('-inf'), None
+        if sum(jetons) == jetons[joueur_id]:
+            return float('inf'), None
+    est_maximisant = trait == joueur_id
+    
     # ===== VÉRIFICATION DU CACHE =====
-    # Clé composée de : état du plateau + joueur actuel + profondeur + type de nœud (max/min)
-    cle = (plateau_to_key(plateau), joueur_id, profondeur, est_maximisant)
-    if cle in cache_arbre:
-        return cache_arbre[cle]
+    # Une entrée est utilisable si elle vient d'une recherche au moins aussi
+    # profonde et si sa borne permet de conclure avec la fenêtre actuelle
+    cle, symetrie = cle_et_symetrie(plateau, joueur_id, trait, autoriser_case_vide)
+    signature = _signature(plateau, symetrie)
+    entree = cache_arbre.sonder(cle, signature)
+    coup_tt = None
+    if entree is not None:
+        profondeur_tt, score_tt, borne_tt, index_tt = entree
+        coup_tt = _depuis_canonique(plateau, index_tt, symetrie)
+        if profondeur_tt >= profondeur and (
+            borne_tt == EXACTE
+            or (borne_tt == INFERIEURE and score_tt >= beta)
+            or (borne_tt == SUPERIEURE and score_tt <= alpha)
+        ):
+            return score_tt, coup_tt
+    
+    # ===== CACHE PERSISTANT =====
+    # Même règle que la table; une entrée utilisable y est recopiée
+    disque = (cache_persistant is not None and ply <= PLY_CACHE_DISQUE
+              and profondeur >= PROFONDEUR_MIN_DISQUE)
+    if disque and (entree is None or entree[0] < profondeur):
+        entree = cache_persistant.sonder(cle)
+        if entree is not None:
+            profondeur_d, score_d, borne_d, index_d = entree
+            if index_d >= 0:
+                coup_tt = _depuis_canonique(plateau, index_d, symetrie)
+            if profondeur_d >= profondeur and (
+                borne_d == EXACTE
+                or (borne_d == INFERIEURE and score_d >= beta)
+                or (borne_d == SUPERIEURE and score_d <= alpha)
+            ):
+                cache_arbre.stocker(cle, profondeur_d, score_d, borne_d, index_d, signature)
+                return score_d, coup_tt
+    alpha_initial, beta_initial = alpha, beta
     
     # ===== GÉNÉRATION DES COUPS =====
-    joueur_actuel = joueur_id if est_maximisant else adversaire_id
-    coups = coups_possibles(plateau, joueur_actuel)
+    joueur_actuel = trait
+    if chrono:
+        debut = time.perf_counter()
+    coups = ordonner_coups(plateau, coups_possibles(plateau, joueur_actuel, autoriser_case_vide),
+                           joueur_actuel, coup_tt, ply)
+    if chrono:
+        stats.temps_generation += time.perf_counter() - debut
     
     # Si pas de coups possibles, on évalue la position actuelle
     if not coups:
-        score = evaluer_plateau(plateau, joueur_id, adversaire_id)
-        result = (score, None)
-        cache_arbre[cle] = result
-        return result
+        score = evaluer_position(plateau, joueur_id)
+        cache_arbre.stocker(cle, profondeur, score, EXACTE, -1, signature)
+        return score, None
     
     # ===== INITIALISATION =====
     meilleur_score = float('-inf') if est_maximisant else float('inf')
     meilleur_coup = None
     
+    # ===== FRONTIÈRE PAR LOTS =====
+    # À profondeur 1, tous les enfants sont des feuilles: ils peuvent être
+    # développés et évalués en un seul lot NumPy
+    scores_feuilles = None
+    if profondeur == 1 and _scores_frontiere is not None:
+        scores_feuilles = _scores_frontiere(
+            plateau, coups, joueur_actuel, joueur_id, autoriser_case_vide
+        )
+    
     # ===== BOUCLE SUR TOUS LES COUPS =====
-    for coup in coups:
+    # Les coups sont joués puis annulés sur le même plateau (journal d'annulation)
+    journal = []
+    essayes = 0  # Rang du coup parmi les coups valides (statistiques de coupure)
+    for i, coup in enumerate(coups):
         x, y = coup
-        plateau_copie = deepcopy(plateau)
         
-        # Jouer le coup sur une copie du plateau
-        if jouer_coup(plateau_copie, x, y, joueur_actuel, autoriser_case_vide=autoriser_case_vide):
-            stats_elagage["noeuds_explores"] += 1
+        if scores_feuilles is not None:
+            # Feuille déjà évaluée par le lot (None = coup invalide)
+            score = scores_feuilles[i]
+            if score is None:
+                continue
+            stats.noeuds_explores += 1
+            stats.noeuds_par_ply[ply + 1] += 1
+            _verifier_budget(stats)
+        else:
+            if chrono:
+                debut = time.perf_counter()
+            if not jouer_coup(plateau, x, y, joueur_actuel, autoriser_case_vide=autoriser_case_vide, journal=journal):
+                continue
+            if chrono:
+                stats.temps_explosions += time.perf_counter() - debut
+            stats.noeuds_explores += 1
+            stats.noeuds_par_ply[ply + 1] += 1
+            _verifier_budget(stats)
             
             # ===== APPEL RÉCURSIF =====
-            # Alternation entre maximisant et minimisant
+            # Au tour du joueur suivant encore en jeu (max si c'est joueur_id, min sinon)
             score, _ = minimax_alpha_beta(
-                plateau_copie,
+                plateau,
                 joueur_id,
-                adversaire_id,
+                joueur_suivant(plateau, joueur_actuel),
                 profondeur - 1,
-                not est_maximisant,  # Alterne max/min
                 alpha,
                 beta,
-                autoriser_case_vide=False
+                autoriser_case_vide=False,
+                ply=ply + 1,
+                stats=stats
             )
+            if chrono:
+                debut = time.perf_counter()
+            annuler_coup(plateau, journal)
+            if chrono:
+                stats.temps_explosions += time.perf_counter() - debut
+        
+        # ===== MISE À JOUR DES SCORES ET ALPHA-BÊTA =====
+        if est_maximisant:
+            # Nœud maximisant: on veut augmenter le score
+            if score > meilleur_score:
+                meilleur_score = score
+                meilleur_coup = coup
+            alpha = max(alpha, meilleur_score)
+        else:
+            # Nœud minimisant: on veut diminuer le score
+            if score < meilleur_score:
+                meilleur_score = score
+                meilleur_coup = coup
+            beta = min(beta, meilleur_score)
+        
+        # ===== ÉLAGAGE ALPHA-BÊTA =====
+        # Si beta <= alpha, les branches suivantes ne changeront pas le résultat
+        if beta <= alpha:
+            stats.noeuds_elagues += 1
+            stats.noter_coupure(essayes)
+            _noter_coupure(plateau, coup, joueur_actuel, profondeur, ply)
+            break  # On coupe l'exploration des autres coups
+        essayes += 1
+    
+    # ===== MISE EN CACHE ET RETOUR =====
+    # Le score n'est exact que s'il est resté strictement dans la fenêtre initiale
+    if meilleur_score <= alpha_initial:
+        borne = SUPERIEURE
+    elif meilleur_score >= beta_initial:
+        borne = INFERIEURE
+    else:
+        borne = EXACTE
+    coup_index = _vers_canonique(plateau, meilleur_coup, symetrie)
+    cache_arbre.stocker(cle, profondeur, meilleur_score, borne, coup_index, signature)
+    if disque:
+        cache_persistant.stocker(cle, profondeur, meilleur_score, borne, coup_index)
+    return meilleur_score, meilleur_coup
+
+
+def _recherche_racine(plateau, joueur_id, profondeur, coups, autoriser_case_vide, resultat, stats):
+    """
+    Cherche le meilleur coup à la racine en notant chaque coup complètement évalué.
+    
+    Si la recherche est interrompue, resultat contient le meilleur coup parmi
+    ceux déjà évalués à cette profondeur. Comme le meilleur coup de
+    l'itération précédente est évalué en premier, ce résultat partiel est
+    au moins aussi bon que celui de l'itération précédente.
+    
+    Args:
+        coups: Coups de la racine, dans l'ordre d'exploration
+        resultat: Dict {"score", "coup"} mis à jour au fil de la recherche
+        stats: StatsRecherche de la recherche en cours
+    """
+    alpha = float('-inf')
+    journal = []
+    for coup in coups:
+        x, y = coup
+        if not jouer_coup(plateau, x, y, joueur_id, autoriser_case_vide=autoriser_case_vide, journal=journal):
+            continue
+        stats.noeuds_explores += 1
+        stats.noeuds_par_ply[1] += 1
+        _verifier_budget(stats)
+        
+        score, _ = minimax_alpha_beta(
+            plateau,
+            joueur_id,
+            joueur_suivant(plateau, joueur_id),
+            profondeur - 1,
+            alpha,
+            float('inf'),
+            autoriser_case_vide=False,
+            ply=1,
+            stats=stats
+        )
+        annuler_coup(plateau, journal)
+        
+        # Même en cas de défaite certaine (-inf partout), on garde un coup jouable
+        if resultat["coup"] is None or score > resultat["score"]:
+            resultat["score"] = score
+            resultat["coup"] = coup
+            alpha = max(alpha, score)
+
+
+def _coups_racine(plateau, joueur_id, premier_coup):
+    """
+    Prépare la racine d'une recherche.
+    
+    Premier ordre: le coup retenu pour cette position lors d'un tour
+    précédent (ou pendant la réflexion sur le temps adverse).
+    
+    Returns:
+        Tuple (cle_racine, symetrie, signature, coups ordonnés)
+    """
+    cle_racine, symetrie = cle_et_symetrie(plateau, joueur_id, joueur_id, premier_coup)
+    signature = _signature(plateau, symetrie)
+    coup_tt = None
+    entree = cache_arbre.sonder(cle_racine, signature)
+    if entree is not None:
+        coup_tt = _depuis_canonique(plateau, entree[3], symetrie)
+    coups = ordonner_coups(plateau, coups_possibles(plateau, joueur_id, premier_coup), joueur_id, coup_tt)
+    return cle_racine, symetrie, signature, coups
+
+
+def _variante_principale(plateau, joueur_id, profondeur, premier_coup):
+    """
+    Suite des meilleurs coups lue dans la table de transposition à partir
+    de la racine (au plus profondeur coups).
+    
+    Les sondes de cette lecture ne comptent pas dans les statistiques de la table.
+    """
+    sondes, succes = cache_arbre.sondes, cache_arbre.succes
+    plateau = plateau.copie()
+    trait = joueur_id
+    autoriser_case_vide = premier_coup
+    pv = []
+    for _ in range(profondeur):
+        cle, symetrie = cle_et_symetrie(plateau, joueur_id, trait, autoriser_case_vide)
+        entree = cache_arbre.sonder(cle, _signature(plateau, symetrie))
+        if entree is None or entree[3] < 0:
+            break
+        coup = _depuis_canonique(plateau, entree[3], symetrie)
+        if not jouer_coup(plateau, coup[0], coup[1], trait, autoriser_case_vide=autoriser_case_vide):
+            break
+        pv.append(coup)
+        trait = joueur_suivant(plateau, trait)
+        autoriser_case_vide = False
+    cache_arbre.sondes, cache_arbre.succes = sondes, succes
+    return pv
+
+
+def rechercher(plateau, joueur_id, temps_max=None, noeuds_max=None, profondeur=None,
+               nb_workers=None, arret=None, chronometrer=False, rappel=None, fichier_stats=None,
+               resoudre_finale=True):
+    """
+    Cherche le meilleur coup par approfondissement itératif, sans le jouer.
+    
+    La recherche est faite aux profondeurs 1, 2, 3... Chaque itération explore
+    d'abord le meilleur coup de la précédente. Sans budget, elle s'arrête à
+    `profondeur` (profondeur_max par défaut). Avec un budget de temps ou de
+    nœuds, elle continue jusqu'à épuisement du budget (ou PROFONDEUR_LIMITE).
+    Une itération interrompue n'est utilisée que si elle a fini d'évaluer au
+    moins le meilleur coup de l'itération précédente.
+    
+    Args:
+        plateau: La grille de jeu (Plateau), non modifiée
+        joueur_id: ID du joueur (de 1 à 4; à plus de deux joueurs, la
+                   recherche est paranoïaque, voir minimax_alpha_beta)
+        temps_max: Budget en secondes (None = pas de limite de temps)
+        noeuds_max: Budget en nœuds explorés (None = pas de limite)
+        profondeur: Profondeur maximale (par défaut profondeur_max, ou
+                    PROFONDEUR_LIMITE si un budget est donné)
+        nb_workers: Si > 1, les coups de la racine sont répartis sur ce
+                    nombre de processus (voir parallele.py)
+        arret: threading.Event optionnel; s'il est levé (depuis un autre
+               thread), la recherche s'arrête comme à la fin du budget
+        chronometrer: Mesurer le temps passé dans la génération des coups,
+                      l'évaluation et les explosions (un peu plus lent)
+        rappel: Fonction appelée avec les statistiques après chaque
+                itération terminée (profondeur, score, variante principale...)
+        fichier_stats: Fichier où ajouter les statistiques finales (une
+                       ligne JSON par recherche)
+        resoudre_finale: En fin de partie (finale.en_finale), tenter d'abord
+                         une résolution exacte (voir finale.py)
+    
+    Returns:
+        Tuple (coup, stats): le coup (x, y) choisi, ou None si aucun coup
+        n'est jouable, et les StatsRecherche de cette recherche
+    """
+    global dernieres_stats, numero_recherche
+    
+    # Les entrées des tours précédents restent consultables mais deviennent remplaçables
+    cache_arbre.nouvelle_recherche()
+    numero_recherche += 1
+    releve_tt = [cache_arbre.sondes, cache_arbre.succes, cache_arbre.stockages]
+    
+    def relever_tt():
+        # Ajoute l'activité de la table depuis le dernier relevé
+        stats.tt_sondes += cache_arbre.sondes - releve_tt[0]
+        stats.tt_succes += cache_arbre.succes - releve_tt[1]
+        stats.tt_stockages += cache_arbre.stockages - releve_tt[2]
+        releve_tt[:] = [cache_arbre.sondes, cache_arbre.succes, cache_arbre.stockages]
+    
+    # Détecte si c'est le premier coup: vrai si le joueur n'a aucun jeton
+    premier_coup = joueur_a_perdu(plateau, joueur_id)
+    
+    if profondeur is None:
+        profondeur = profondeur_max if temps_max is None and noeuds_max is None else PROFONDEUR_LIMITE
+    # Une profondeur demandée peut dépasser PROFONDEUR_LIMITE (sans budget)
+    stats = StatsRecherche(chronometrer, max(profondeur, PROFONDEUR_LIMITE))
+    
+    debut = time.perf_counter()
+    
+    # Fin de partie: une issue forcée se joue sans recherche heuristique (victoire
+    # la plus courte, ou défaite la plus lente). Sinon, recherche normale.
+    if resoudre_finale and not premier_coup and en_finale(plateau):
+        noeuds_finale = NOEUDS_FINALE
+        if noeuds_max is not None:
+            noeuds_finale = min(noeuds_finale, int(FRACTION_FINALE * noeuds_max))
+        issue, coup, distance, noeuds = resoudre(
+            plateau, joueur_id,
+            noeuds_max=noeuds_finale,
+            echeance=debut + FRACTION_FINALE * temps_max if temps_max is not None else None,
+            arret=arret
+        )
+        stats.noeuds_explores += noeuds
+        if issue:
+            stats.profondeur = distance
+            stats.score = float('inf') if issue > 0 else float('-inf')
+            stats.pv = [coup]
+            stats.duree = time.perf_counter() - debut
+            dernieres_stats = stats
+            if fichier_stats:
+                stats.ecrire_json(fichier_stats)
+            return coup, stats
+    
+    limites_recherche["echeance"] = debut + temps_max if temps_max is not None else None
+    limites_recherche["noeuds_max"] = noeuds_max
+    limites_recherche["arret"] = arret
+    
+    # La recherche travaille sur une copie: une interruption peut la laisser
+    # au milieu d'un coup
+    plateau_recherche = plateau.copie()
+    coups_killers.clear()
+    historique.clear()
+    
+    cle_racine, symetrie, signature, coups = _coups_racine(plateau, joueur_id, premier_coup)
+    coup_choisi = None
+    
+    if nb_workers is not None and nb_workers > 1:
+        from functools import partial
+        from parallele import recherche_racine_parallele
+        chercher_racine = partial(recherche_racine_parallele, nb_workers=nb_workers)
+    else:
+        chercher_racine = _recherche_racine
+    
+    try:
+        for p in range(1, profondeur + 1):
+            resultat = {"score": float('-inf'), "coup": None}
+            noeuds_avant = stats.noeuds_explores
+            debut_iteration = time.perf_counter()
+            try:
+                chercher_racine(plateau_recherche, joueur_id, p, coups, premier_coup, resultat, stats)
+            except RechercheInterrompue:
+                if resultat["coup"] is not None:
+                    coup_choisi = resultat["coup"]
+                    stats.score = resultat["score"]
+                break
             
-            # ===== MISE À JOUR DES SCORES ET ALPHA-BÊTA =====
-            if est_maximisant:
-                # Nœud maximisant: on veut augmenter le score
-                if score > meilleur_score:
-                    meilleur_score = score
-                    meilleur_coup = coup
-                alpha = max(alpha, meilleur_score)
-            else:
-                # Nœud minimisant: on veut diminuer le score
-                if score < meilleur_score:
-                    meilleur_score = score
-                    meilleur_coup = coup
-                beta = min(beta, meilleur_score)
+            coup_choisi = resultat["coup"]
+            stats.profondeur = p
+            stats.score = resultat["score"]
+            stats.noeuds_par_iteration.append(stats.noeuds_explores - noeuds_avant)
+            stats.temps_par_iteration.append(time.perf_counter() - debut_iteration)
+            if coup_choisi is not None:
+                index_choisi = _vers_canonique(plateau, coup_choisi, symetrie)
+                cache_arbre.stocker(cle_racine, p, resultat["score"], EXACTE, index_choisi, signature)
+                if cache_persistant is not None and p >= PROFONDEUR_MIN_DISQUE:
+                    cache_persistant.stocker(cle_racine, p, resultat["score"], EXACTE, index_choisi)
+                stats.pv = _variante_principale(plateau, joueur_id, p, premier_coup)
+            if rappel is not None:
+                stats.duree = time.perf_counter() - debut
+                relever_tt()
+                rappel(stats)
+            if coup_choisi is None or abs(resultat["score"]) == float('inf'):
+                break  # Aucun coup, ou issue de la partie déjà connue
             
-            # ===== ÉLAGAGE ALPHA-BÊTA =====
-            # Si beta <= alpha, les branches suivantes ne changeront pas le résultat
-            if beta <= alpha:
-                stats_elagage["noeuds_elagues"] += 1
-                break  # On coupe l'exploration des autres coups
+            # Le meilleur coup passe en tête pour l'itération suivante. Les
+            # autres gardent leur ordre: il ne dépend ainsi que de la racine
+            # (et pas de l'historique, propre à chaque processus en parallèle)
+            coups.remove(coup_choisi)
+            coups.insert(0, coup_choisi)
+            
+            # Une nouvelle itération coûte plus que toutes les précédentes:
+            # inutile de la commencer si la moitié du temps est déjà passée
+            if temps_max is not None and time.perf_counter() - debut > temps_max / 2:
+                break
+    finally:
+        limites_recherche["echeance"] = None
+        limites_recherche["noeuds_max"] = None
+        limites_recherche["arret"] = None
+        if cache_persistant is not None:
+            cache_persistant.ecrire()
+    
+    if coup_choisi is None and coups:
+        # Budget épuisé avant la fin du premier coup de la profondeur 1: un coup
+        # jouable reste préférable à aucun (les coups de la racine sont tous légaux)
+        coup_choisi = coups[0]
+    
+    stats.duree = time.perf_counter() - debut
+    relever_tt()
+    if coup_choisi is not None and (not stats.pv or stats.pv[0] != coup_choisi):
+        stats.pv = [coup_choisi]  # Itération interrompue: seul le premier coup est sûr
+    dernieres_stats = stats
+    if fichier_stats:
+        stats.ecrire_json(fichier_stats)
+    return coup_choisi, stats
+
+
+def meilleur_coup(plateau, joueur_id, temps_max=None, noeuds_max=None, profondeur=None,
+                  nb_workers=None, arret=None):
+    """
+    Cherche le meilleur coup, sans le jouer (voir rechercher pour les arguments).
     
-    # ===== MISE EN CACHE ET RETOUR =====
-    result = (meilleur_score, meilleur_coup)
-    cache_arbre[cle] = result
-    return result
+    Returns:
+        Le coup (x, y) choisi, ou None si aucun coup n'est jouable
+    """
+    coup, _ = rechercher(plateau, joueur_id, temps_max=temps_max, noeuds_max=noeuds_max,
+                         profondeur=profondeur, nb_workers=nb_workers, arret=arret)
+    return coup
 
 
-def minimax_bot(plateau, joueur_id):
+def reflechir_pendant_adversaire(plateau, joueur_id, adversaire_id, arret, profondeur=None):
+    """
+    Recherche sur le temps de l'adversaire (« pondering »).
+    
+    Pendant que adversaire_id réfléchit, cherche la réponse de joueur_id à
+    chacun de ses coups possibles (ceux après lesquels c'est bien à
+    joueur_id de jouer), par approfondissement itératif: toutes
+    les réponses à la profondeur 1, puis toutes à la profondeur 2, etc. Les
+    résultats ne servent qu'à remplir la table de transposition: une fois le
+    coup adverse joué, meilleur_coup retrouve les profondeurs déjà atteintes
+    presque sans effort et continue au-delà.
+    
+    Conçue pour tourner dans un thread: elle s'arrête quand arret est levé
+    (le plateau passé n'est jamais modifié).
+    
+    Args:
+        plateau: Position où adversaire_id doit jouer
+        joueur_id: Joueur pour qui on prépare la réponse
+        adversaire_id: Joueur au trait
+        arret: threading.Event qui termine la réflexion
+        profondeur: Profondeur maximale (par défaut PROFONDEUR_LIMITE)
+    
+    Returns:
+        La dernière profondeur complètement explorée pour tous les coups adverses
+    """
+    stats = StatsRecherche(profondeur_max=max(profondeur or 0, PROFONDEUR_LIMITE))
+    cache_arbre.nouvelle_recherche()
+    coups_killers.clear()
+    historique.clear()
+    limites_recherche["arret"] = arret
+    
+    premier_coup = joueur_a_perdu(plateau, adversaire_id)
+    enfants = []
+    for x, y in ordonner_coups(plateau, coups_possibles(plateau, adversaire_id, premier_coup), adversaire_id):
+        enfant = plateau.copie()
+        if jouer_coup(enfant, x, y, adversaire_id, autoriser_case_vide=premier_coup):
+            if joueur_suivant(enfant, adversaire_id) == joueur_id:
+                enfants.append(enfant)
+    
+    try:
+        for p in range(1, (profondeur or PROFONDEUR_LIMITE) + 1):
+            for enfant in enfants:
+                cle_racine, symetrie, signature, coups = _coups_racine(enfant, joueur_id, False)
+                resultat = {"score": float('-inf'), "coup": None}
+                _recherche_racine(enfant, joueur_id, p, coups, False, resultat, stats)
+                if resultat["coup"] is not None:
+                    cache_arbre.stocker(
+                        cle_racine, p, resultat["score"], EXACTE,
+                        _vers_canonique(enfant, resultat["coup"], symetrie), signature
+                    )
+            stats.profondeur = p
+    except RechercheInterrompue:
+        pass
+    finally:
+        limites_recherche["arret"] = None
+    
+    return stats.profondeur
+
+
+def minimax_bot(plateau, joueur_id, temps_max=None, noeuds_max=None, nb_workers=None):
     """
     Fonction principale du bot qui utilise l'algorithme Minimax avec Alpha-Bêta Pruning.
     
     Cette fonction:
     1. Détecte si c'est le premier coup du joueur
-    2. Appelle minimax_alpha_beta pour trouver le meilleur coup
+    2. Appelle meilleur_coup (approfondissement itératif) pour trouver le meilleur coup
     3. Joue le coup sur le plateau original
     
     Args:
-        plateau: La grille de jeu (List[List[Cell]])
+        plateau: La grille de jeu (Plateau)
         joueur_id: ID du joueur (1 ou 2)
+        temps_max: Budget de réflexion en secondes (None = profondeur_max fixe)
+        noeuds_max: Budget en nœuds explorés (None = pas de limite)
+        nb_workers: Nombre de processus pour la recherche parallèle (None = séquentielle)
     
     Returns:
         True si un coup a été joué, False sinon
     """
-    global stats_elagage
-    
-    # Réinitialiser les stats
-    stats_elagage = {"noeuds_elagues": 0, "noeuds_explores": 0}
-    
-    # Calcul l'ID de l'adversaire (1 <-> 2)
-    adversaire_id = 3 - joueur_id
-    
-    # Détecte si c'est le premier coup: vrai si le joueur n'a aucun jeton
-    premier_coup = all(cell.joueur != joueur_id for row in plateau for cell in row)
-    
-    # Appelle l'algorithme minimax en mode maximisant (on cherche à maximiser)
-    _, coup = minimax_alpha_beta(
-        plateau,
-        joueur_id,
-        adversaire_id,
-        profondeur_max,
-        est_maximisant=True,
-        alpha=float('-inf'),
-        beta=float('inf'),
-        autoriser_case_vide=premier_coup
-    )
-    
-    # Afficher les stats d'élagage (optionnel)
-    # print(f"Noeuds explorés: {stats_elagage['noeuds_explores']}, Noeuds élaguées: {stats_elagage['noeuds_elagues']}")
+    premier_coup = joueur_a_perdu(plateau, joueur_id)
+    coup = meilleur_coup(plateau, joueur_id, temps_max=temps_max, noeuds_max=noeuds_max,
+                         nb_workers=nb_workers)
     
     # Joue le coup trouvé
     if coup:
@@ -288,21 +959,38 @@ def vider_cache():
     Réinitialise le cache global.
     
     À utiliser si vous voulez forcer le recalcul de toutes les positions
-    (par exemple, au début d'une nouvelle partie).
+    (par exemple, au début d'une nouvelle partie). La table est recréée avec
+    TAILLE_CACHE_MO et VERIFIER_COLLISIONS courants.
     """
     global cache_arbre
-    cache_arbre = {}
+    cache_arbre = TableTransposition(TAILLE_CACHE_MO, verifier=VERIFIER_COLLISIONS)
+    vider_table_finale()
 
 
-def afficher_stats_elagage():
+def afficher_stats_elagage(stats=None):
     """
-    Affiche les statistiques d'élagage alpha-bêta.
+    Affiche les statistiques d'une recherche (par défaut la dernière terminée).
     
     Utile pour vérifier l'efficacité du pruning:
     - Si beaucoup de nœuds sont élaguées, c'est bon! On explore moins.
     - Si peu de nœuds sont élaguées, c'est que l'ordre des coups n'est pas optimal.
+    - Si les coupures arrivent surtout au premier coup essayé, l'ordre est bon.
     """
-    print(f"Nœuds explorés: {stats_elagage['noeuds_explores']}")
-    print(f"Nœuds élaguées: {stats_elagage['noeuds_elagues']}")
-    ratio = (stats_elagage['noeuds_elagues'] / max(1, stats_elagage['noeuds_explores'] + stats_elagage['noeuds_elagues'])) * 100
-    print(f"Efficacité du pruning: {ratio:.1f}%")
\ No newline at end of file
+    stats = stats or dernieres_stats
+    if stats is None:
+        print("Aucune recherche terminée")
+        return
+    print(f"Profondeur: {stats.profondeur}, score: {stats.score}, variante: {stats.pv}")
+    print(f"Nœuds explorés: {stats.noeuds_explores} en {stats.duree:.3f}s")
+    print(f"Nœuds élaguées: {stats.noeuds_elagues}")
+    ratio = (stats.noeuds_elagues / max(1, stats.noeuds_explores + stats.noeuds_elagues)) * 100
+    print(f"Efficacité du pruning: {ratio:.1f}%")
+    facteur = stats.facteur_branchement()
+    if facteur is not None:
+        print(f"Facteur de branchement effectif: {facteur:.2f}")
+    print(f"Table: {stats.tt_sondes} sondes, {100 * stats.taux_succes_tt():.1f}% de succès, "
+          f"{stats.tt_stockages} stockages")
+    print(f"Coupures par rang du coup: {stats.coupures_par_indice}")
+    if stats.chronometrer:
+        print(f"Temps: génération {stats.temps_generation:.3f}s, évaluation {stats.temps_evaluation:.3f}s, "
+              f"explosions {stats.temps_explosions:.3f}s")
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Recherche parallèle à la racine (root splitting) sur plusieurs processus.
+
+Le coup principal (le meilleur de l'itération précédente) est cherché
+d'abord, seul, pour obtenir une borne alpha. Les autres coups de la racine
+sont ensuite répartis entre les processus; chaque nouveau coup envoyé part
+avec le meilleur alpha connu à cet instant.
+
+Chaque coup est cherché avec la fenêtre (alpha - 1, +inf): un coup qui
+égale le meilleur score reçoit donc un score exact, et le choix final (le
+premier coup, dans l'ordre de la racine, qui atteint le meilleur score) est
+le même que celui de la recherche séquentielle à profondeur égale.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import minimax
+from game import jouer_coup, joueur_suivant
+from statistiques import StatsRecherche
+
+# Pool réutilisé d'un coup à l'autre: créer des processus coûte cher
+_pool = None
+_nb_workers_pool = 0
+
+# Demande d'arrêt partagée avec les processus du pool (leur limites_recherche["arret"])
+_arret_pool = None
+
+# Intervalle (secondes) de vérification de la demande d'arrêt pendant l'attente
+ATTENTE_ARRET = 0.05
+
+# Dans un processus du pool: recherche (minimax.numero_recherche du processus
+# principal) à laquelle appartient la dernière tâche reçue
+_recherche_en_cours = None
+
+
+def obtenir_pool(nb_workers=None):
+    """Retourne le pool de processus partagé (recréé si la taille change)"""
+    global _pool, _nb_workers_pool, _arret_pool
+    nb_workers = nb_workers or os.cpu_count() or 1
+    if _pool is None or _nb_workers_pool != nb_workers:
+        fermer_pool()
+        _arret_pool = multiprocessing.Event()
+        _pool = ProcessPoolExecutor(max_workers=nb_workers, initializer=_initialiser_processus,
+                                    initargs=(_arret_pool,))
+        _nb_workers_pool = nb_workers
+    return _pool
+
+
+def _initialiser_processus(arret):
+    """Dans chaque processus du pool: la demande d'arrêt lue par minimax._verifier_budget"""
+    minimax.limites_recherche["arret"] = arret
+
+
+def fermer_pool():
+    """Arrête les tâches en cours et les processus du pool partagé"""
+    global _pool, _nb_workers_pool, _arret_pool
+    if _pool is not None:
+        # Les tâches en cours s'arrêtent d'elles-mêmes: l'attente est courte, et
+        # les processus ne survivent pas à la fermeture de l'interpréteur
+        _arret_pool.set()
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _arret_pool = None
+        _nb_workers_pool = 0
+
+
+def _chercher_coup(plateau, joueur_id, profondeur, coup,
+                   autoriser_case_vide, alpha, temps_restant, noeuds_max, chronometrer,
+                   chemin_cache=None, recherche=None):
+    """
+    Tâche exécutée dans un processus: score d'un coup de la racine.
+
+    La table de transposition du processus est conservée d'une tâche à
+    l'autre; comme celle du processus principal, elle vieillit à chaque
+    nouvelle recherche (recherche: minimax.numero_recherche du processus
+    principal). La tâche s'arrête aussi, comme une recherche interrompue,
+    quand le processus principal lève la demande d'arrêt du pool. chemin_cache est le fichier du cache persistant du
+    processus principal (None s'il est désactivé): chaque processus l'ouvre
+    à son tour.
+
+    Returns:
+        Tuple (score, stats), score None si la tâche a épuisé son budget
+    """
+    persistant = minimax.cache_persistant
+    if (persistant.chemin if persistant is not None else None) != chemin_cache:
+        minimax.activer_cache_disque(chemin_cache)
+    global _recherche_en_cours
+    stats = StatsRecherche(chronometrer, max(profondeur, minimax.PROFONDEUR_LIMITE))
+    table = minimax.cache_arbre
+    if recherche != _recherche_en_cours:
+        table.nouvelle_recherche()
+        _recherche_en_cours = recherche
+    releve_tt = (table.sondes, table.succes, table.stockages)
+    minimax.coups_killers.clear()
+    minimax.historique.clear()
+    minimax.limites_recherche["echeance"] = (
+        time.perf_counter() + temps_restant if temps_restant is not None else None
+    )
+    minimax.limites_recherche["noeuds_max"] = noeuds_max
+    score = None
+    try:
+        jouer_coup(plateau, coup[0], coup[1], joueur_id, autoriser_case_vide=autoriser_case_vide)
+        score, _ = minimax.minimax_alpha_beta(
+            plateau, joueur_id, joueur_suivant(plateau, joueur_id), profondeur - 1,
+            alpha, float('inf'), autoriser_case_vide=False, ply=1, stats=stats
+        )
+    except minimax.RechercheInterrompue:
+        pass
+    finally:
+        minimax.limites_recherche["echeance"] = None
+        minimax.limites_recherche["noeuds_max"] = None
+        if minimax.cache_persistant is not None:
+            minimax.cache_persistant.ecrire()
+    stats.noeuds_explores += 1  # Le coup de la racine lui-même
+    stats.noeuds_par_ply[1] += 1
+    stats.tt_sondes = table.sondes - releve_tt[0]
+    stats.tt_succes = table.succes - releve_tt[1]
+    stats.tt_stockages = table.stockages - releve_tt[2]
+    return score, stats
+
+
+def recherche_racine_parallele(plateau, joueur_id, profondeur, coups,
+                               autoriser_case_vide, resultat, stats, nb_workers=None):
+    """
+    Équivalent parallèle de minimax._recherche_racine (même contrat).
+
+    Les budgets de minimax.limites_recherche sont respectés: chaque tâche
+    reçoit le temps restant et une part des nœuds restants (ceux qui ne sont
+    pas déjà réservés par les tâches en cours, partagés entre les tâches
+    lancées ensemble), et RechercheInterrompue est levée
+    si le budget est épuisé avant la fin. resultat contient alors le meilleur
+    coup parmi ceux dont l'évaluation, et celle de tous les coups qui les
+    précèdent, est terminée. Les tâches encore en cours à la sortie sont
+    arrêtées par la demande d'arrêt du pool.
+
+    Args:
+        coups: Coups de la racine, dans l'ordre d'exploration
+        resultat: Dict {"score", "coup"} mis à jour au fil de la recherche
+        stats: StatsRecherche de la recherche, complétée avec celles des tâches
+        nb_workers: Nombre de processus (par défaut: nombre de cœurs)
+    """
+    pool = obtenir_pool(nb_workers)
+    nb_workers = _nb_workers_pool
+    limites = minimax.limites_recherche
+    valides = [c for c in coups if _coup_valide(plateau, c, joueur_id, autoriser_case_vide)]
+    # Les processus lisent le cache persistant dans le fichier: le lot en attente doit y être
+    persistant = minimax.cache_persistant
+    chemin_cache = None
+    if persistant is not None:
+        persistant.ecrire()
+        chemin_cache = persistant.chemin
+
+    recherche = minimax.numero_recherche
+
+    scores = {}  # indice dans valides -> score (None si interrompu)
+    alpha = float('-inf')
+    en_cours = {}
+    reserves = {}  # futur -> nœuds accordés à la tâche
+    suivant = 0
+
+    def budget():
+        echeance = limites["echeance"]
+        temps = None if echeance is None else max(0.0, echeance - time.perf_counter())
+        noeuds = limites["noeuds_max"]
+        reste = None if noeuds is None else max(0, noeuds - stats.noeuds_explores - sum(reserves.values()))
+        return temps, reste
+
+    def soumettre(indice, parts):
+        """Lance le coup indice avec 1 / parts des nœuds encore libres"""
+        temps, reste = budget()
+        if reste is not None:
+            reste //= parts
+        # alpha - 1: un score égal à alpha reste exact (départage par l'ordre)
+        borne = alpha - 1 if alpha != float('-inf') else alpha
+        futur = pool.submit(
+            _chercher_coup, plateau, joueur_id, profondeur,
+            valides[indice], autoriser_case_vide, borne, temps, reste, stats.chronometrer,
+            chemin_cache, recherche
+        )
+        en_cours[futur] = indice
+        if reste is not None:
+            reserves[futur] = reste
+
+    def recolter(futurs):
+        """Enregistre les scores reçus; False si une tâche a épuisé son budget"""
+        nonlocal alpha
+        complet = True
+        for futur in futurs:
+            indice = en_cours.pop(futur)
+            reserves.pop(futur, None)
+            score, stats_tache = futur.result()
+            stats.fusionner(stats_tache)
+            scores[indice] = score
+            if score is None:
+                complet = False
+            elif score > alpha:
+                alpha = score
+        return complet
+
+    def publier():
+        # Meilleur coup parmi le plus long préfixe entièrement évalué
+        for indice in range(len(valides)):
+            score = scores.get(indice)
+            if score is None:
+                break
+            if resultat["coup"] is None or score > resultat["score"]:
+                resultat["score"] = score
+                resultat["coup"] = valides[indice]
+
+    try:
+        # Coup principal seul d'abord: il fournit la borne alpha
+        if valides:
+            soumettre(0, 1)
+            suivant = 1
+        while en_cours:
+            temps, _ = budget()
+            arret = limites["arret"]
+            if arret is not None:
+                # Attente par tranches pour voir passer une demande d'arrêt
+                temps = ATTENTE_ARRET if temps is None else min(temps, ATTENTE_ARRET)
+            finis, _ = wait(list(en_cours), timeout=temps, return_when=FIRST_COMPLETED)
+            if arret is not None and arret.is_set():
+                raise minimax.RechercheInterrompue()
+            if not finis:
+                temps, _ = budget()
+                if temps is None or temps > 0:
+                    continue  # Simple tranche d'attente écoulée
+                raise minimax.RechercheInterrompue()
+            if not recolter(finis):
+                raise minimax.RechercheInterrompue()
+            if limites["noeuds_max"] is not None and stats.noeuds_explores > limites["noeuds_max"]:
+                raise minimax.RechercheInterrompue()
+            # Les places libres se partagent les nœuds libres
+            lances = min(nb_workers - len(en_cours), len(valides) - suivant)
+            for parts in range(lances, 0, -1):
+                soumettre(suivant, parts)
+                suivant += 1
+    finally:
+        demarres = [futur for futur in en_cours if not futur.cancel()]
+        if demarres:
+            # Sans budget, ces tâches occuperaient le pool indéfiniment: on les
+            # arrête et on attend leur fin avant la prochaine recherche
+            _arret_pool.set()
+            wait(demarres)
+            _arret_pool.clear()
+        publier()
+
+
+def _coup_valide(plateau, coup, joueur, autoriser_case_vide):
+    """Vrai si jouer_coup accepterait ce coup"""
+    proprietaire = plateau.cases[2 * (coup[0] * plateau.size + coup[1])]
+    return proprietaire == joueur or (proprietaire == 0 and autoriser_case_vide)
@@ -0,0 +1,116 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Les coupures au-delà de cet indice de coup sont comptées dans la dernière case
+NB_INDICES_COUPURE = 16
+
+
+class StatsRecherche:
+    """
+    Statistiques d'une recherche (un appel à minimax.rechercher).
+
+    Chaque recherche a son propre objet: il est passé le long de l'arbre
+    plutôt que partagé dans une variable globale, et peut être renvoyé
+    d'un processus à l'autre (voir fusionner).
+    """
+
+    __slots__ = (
+        "noeuds_explores", "noeuds_elagues", "noeuds_par_ply", "noeuds_par_iteration",
+        "temps_par_iteration", "coupures_par_indice", "tt_sondes", "tt_succes", "tt_stockages",
+        "chronometrer", "temps_generation", "temps_evaluation", "temps_explosions",
+        "profondeur", "score", "pv", "duree",
+    )
+
+    def __init__(self, chronometrer: bool = False, profondeur_max: int = 64):
+        """
+        Args:
+            chronometrer: Si True, mesure le temps passé dans la génération
+                          des coups, l'évaluation et les coups joués (avec
+                          leurs explosions). Coûte quelques % de vitesse.
+            profondeur_max: Nombre de plies suivis dans noeuds_par_ply
+        """
+        self.noeuds_explores = 0
+        self.noeuds_elagues = 0
+        self.noeuds_par_ply = [0] * (profondeur_max + 2)
+        self.noeuds_par_iteration: List[int] = []
+        self.temps_par_iteration: List[float] = []
+        self.coupures_par_indice = [0] * NB_INDICES_COUPURE
+        self.tt_sondes = 0
+        self.tt_succes = 0
+        self.tt_stockages = 0
+        self.chronometrer = chronometrer
+        self.temps_generation = 0.0
+        self.temps_evaluation = 0.0
+        self.temps_explosions = 0.0
+        self.profondeur = 0
+        self.score: Optional[float] = None
+        self.pv: List[Tuple[int, int]] = []
+        self.duree = 0.0
+
+    def noter_coupure(self, indice: int):
+        """Coupure beta provoquée par le coup numéro indice (0 = premier essayé)"""
+        self.coupures_par_indice[min(indice, NB_INDICES_COUPURE - 1)] += 1
+
+    def facteur_branchement(self) -> Optional[float]:
+        """
+        Facteur de branchement effectif: rapport des nœuds des deux
+        dernières itérations complètes (None s'il y en a moins de deux).
+        """
+        n = self.noeuds_par_iteration
+        if len(n) < 2 or n[-2] == 0:
+            return None
+        return n[-1] / n[-2]
+
+    def taux_succes_tt(self) -> float:
+        return self.tt_succes / self.tt_sondes if self.tt_sondes else 0.0
+
+    def fusionner(self, autre: "StatsRecherche"):
+        """Ajoute les compteurs d'une sous-recherche (autre processus)"""
+        self.noeuds_explores += autre.noeuds_explores
+        self.noeuds_elagues += autre.noeuds_elagues
+        for ply, n in enumerate(autre.noeuds_par_ply[:len(self.noeuds_par_ply)]):
+            self.noeuds_par_ply[ply] += n
+        for i, n in enumerate(autre.coupures_par_indice):
+            self.coupures_par_indice[i] += n
+        self.tt_sondes += autre.tt_sondes
+        self.tt_succes += autre.tt_succes
+        self.tt_stockages += autre.tt_stockages
+        self.temps_generation += autre.temps_generation
+        self.temps_evaluation += autre.temps_evaluation
+        self.temps_explosions += autre.temps_explosions
+
+    def vers_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable en JSON"""
+        dernier_ply = max((p for p, n in enumerate(self.noeuds_par_ply) if n), default=0)
+        return {
+            "profondeur": self.profondeur,
+            "score": self.score,
+            "pv": [list(coup) for coup in self.pv],
+            "duree": self.duree,
+            "noeuds_explores": self.noeuds_explores,
+            "noeuds_elagues": self.noeuds_elagues,
+            "nps": self.noeuds_explores / self.duree if self.duree else 0.0,
+            "noeuds_par_ply": self.noeuds_par_ply[:dernier_ply + 1],
+            "noeuds_par_iteration": self.noeuds_par_iteration,
+            "temps_par_iteration": self.temps_par_iteration,
+            "facteur_branchement": self.facteur_branchement(),
+            "coupures_par_indice": self.coupures_par_indice,
+            "tt_sondes": self.tt_sondes,
+            "tt_succes": self.tt_succes,
+            "tt_stockages": self.tt_stockages,
+            "temps_generation": self.temps_generation if self.chronometrer else None,
+            "temps_evaluation": self.temps_evaluation if self.chronometrer else None,
+            "temps_explosions": self.temps_explosions if self.chronometrer else None,
+        }
+
+    def ecrire_json(self, fichier: str):
+        """Ajoute ces statistiques comme une ligne JSON à la fin de fichier"""
+        with open(fichier, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.vers_dict()) + "\n")
+
+    def __getstate__(self):
+        return {nom: getattr(self, nom) for nom in self.__slots__}
+
+    def __setstate__(self, etat):
+        for nom, valeur in etat.items():
+            setattr(self, nom, valeur)
@@ -0,0 +1,112 @@
+from array import array
+from typing import Optional, Tuple
+
+# -----------------------
+# TYPES DE BORNE
+# -----------------------
+EXACTE = 0      # Score exact (fenêtre alpha-bêta non franchie)
+INFERIEURE = 1  # Coupure beta: le vrai score est >= score stocké
+SUPERIEURE = 2  # Échec alpha: le vrai score est <= score stocké
+
+# Octets par entrée: clé (8) + score (8) + profondeur (1) + borne (1) + coup (2) + âge (2)
+OCTETS_PAR_ENTREE = 22
+
+# Entrée renvoyée par sonder: (profondeur, score, borne, coup)
+Entree = Tuple[int, float, int, int]
+
+
+class TableTransposition:
+    """
+    Table de transposition de capacité fixe, stockée dans des array typés.
+
+    Chaque seau contient deux entrées:
+    - l'entrée 0 est « préférence profondeur »: elle n'est remplacée que par
+      une recherche au moins aussi profonde, ou si elle date d'un ancien tour
+    - l'entrée 1 est « toujours remplacer »: elle reçoit tout le reste
+
+    La mémoire est allouée une fois pour toutes à la création: elle reste
+    constante quelle que soit la durée de la partie.
+    """
+
+    def __init__(self, taille_mo: float = 32, verifier: bool = False):
+        """
+        Args:
+            taille_mo: Capacité de la table en mégaoctets
+            verifier: Si True, garde une signature du plateau par entrée pour
+                      détecter les collisions de clé (debug)
+        """
+        self.nb_seaux = max(1, int(taille_mo * 1024 * 1024) // (2 * OCTETS_PAR_ENTREE))
+        self.verifier = verifier
+        self.age = 0
+        self._allouer()
+
+    def _allouer(self):
+        n = 2 * self.nb_seaux
+        self.cles = array("Q", bytes(8 * n))
+        self.scores = array("d", bytes(8 * n))
+        self.profondeurs = array("b", [-1]) * n  # -1 = entrée vide
+        self.bornes = array("B", bytes(n))
+        self.coups = array("h", [-1]) * n        # -1 = pas de coup
+        self.ages = array("H", bytes(2 * n))
+        self.signatures = [None] * n if self.verifier else None
+        self.sondes = 0
+        self.succes = 0
+        self.stockages = 0
+
+    def vider(self):
+        """Efface toutes les entrées (la capacité ne change pas)"""
+        self.age = 0
+        self._allouer()
+
+    def nouvelle_recherche(self):
+        """Vieillit les entrées existantes: elles deviennent remplaçables"""
+        self.age = (self.age + 1) & 0xFFFF
+
+    def __len__(self):
+        return sum(1 for p in self.profondeurs if p >= 0)
+
+    def sonder(self, cle: int, signature: Optional[bytes] = None) -> Optional[Entree]:
+        """
+        Cherche une position dans la table.
+
+        Returns:
+            (profondeur, score, borne, coup) ou None si absente
+        """
+        self.sondes += 1
+        base = 2 * (cle % self.nb_seaux)
+        for i in (base, base + 1):
+            if self.profondeurs[i] >= 0 and self.cles[i] == cle:
+                if self.signatures is not None and self.signatures[i] != signature:
+                    return None
+                self.succes += 1
+                return self.profondeurs[i], self.scores[i], self.bornes[i], self.coups[i]
+        return None
+
+    def stocker(self, cle: int, profondeur: int, score: float, borne: int, coup: int,
+                signature: Optional[bytes] = None):
+        """
+        Enregistre le résultat d'une recherche selon la politique de remplacement.
+
+        Args:
+            cle: Clé 64 bits de la position
+            profondeur: Profondeur restante de la recherche
+            score: Score trouvé
+            borne: EXACTE, INFERIEURE ou SUPERIEURE
+            coup: Meilleur coup (indice de case) ou -1
+        """
+        self.stockages += 1
+        base = 2 * (cle % self.nb_seaux)
+        i = base
+        if (self.profondeurs[base] >= 0
+                and self.cles[base] != cle
+                and self.ages[base] == self.age
+                and self.profondeurs[base] > profondeur):
+            i = base + 1
+        self.cles[i] = cle
+        self.scores[i] = score
+        self.profondeurs[i] = min(profondeur, 127)
+        self.bornes[i] = borne
+        self.coups[i] = coup
+        self.ages[i] = self.age
+        if self.signatures is not None:
+            self.signatures[i] = signature